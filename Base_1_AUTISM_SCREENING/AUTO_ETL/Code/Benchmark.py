@@ -0,0 +1,543 @@
+"""
+Benchmark.py
+Performance benchmarks for the Autism Screening ETL pipeline
+"""
+
+import argparse
+import contextlib
+import datetime
+import functools
+import http.server
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from Transform import (
+    normalize_strings, run_stages, read_source, memory_usage_mb, save_dataset, read_dataset,
+    rule_violations, print_rule_report, TRANSFORM_STAGES, COUNTRY_LOOKUP, RAW_DTYPES, READ_ENGINES
+)
+from Targets import SQLiteTarget
+from Extract import FILES
+import Scores
+
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+ETL_DIR = os.path.dirname(CODE_DIR)
+
+# Default results file of the stage suite; one JSON record per line
+RESULTS_PATH = 'benchmark_results.jsonl'
+
+# Share of the rows in each source file, as in the real datasets
+SOURCE_SHARES = {
+    'data/Autism-Child-Data.csv': 0.27,
+    'data/Autism-Adolescent-Data.csv': 0.09,
+    'data/Autism-Adult-Data.csv': 0.64
+}
+
+
+# Vocabularies mirroring the raw Autism-*-Data.csv files, including their
+# inconsistent casing and trailing whitespace
+GENDERS = ['m', 'f']
+YES_NO = ['yes', 'no']
+ETHNICITIES = [
+    'White-European', 'Asian', 'Middle Eastern ', 'Black', 'South Asian',
+    'Others', 'others', 'Latino', 'Hispanic', 'Pasifika', 'Turkish'
+]
+COUNTRIES = [
+    'United States', 'United Kingdom', 'India', 'Jordan', 'New Zealand',
+    'AmericanSamoa', 'Viet Nam', 'U.S. Outlying Islands', 'Brazil', 'Austria'
+]
+RELATIONS = ['Self', 'self', 'Parent', 'Relative', 'Health care professional', 'Others']
+CLASSES = ['YES', 'NO']
+
+
+def make_synthetic_screening(n_rows, seed=0, missing_rate=0.05):
+    """Build a raw screening frame with the same columns and quirks as the source CSVs"""
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return np.asarray(values, dtype=object)[rng.integers(0, len(values), n_rows)]
+
+    data = {}
+    for i in range(1, 11):
+        data[f'A{i}_Score'] = rng.integers(0, 2, n_rows)
+    data['age'] = rng.integers(4, 80, n_rows).astype(float)
+    data['gender'] = pick(GENDERS)
+    data['ethnicity'] = pick(ETHNICITIES)
+    data['jundice'] = pick(YES_NO)
+    data['austim'] = pick(YES_NO)
+    data['contry_of_res'] = pick(COUNTRIES)
+    data['used_app_before'] = pick(YES_NO)
+    data['result'] = sum(data[f'A{i}_Score'] for i in range(1, 11)).astype(float)
+    data['age_desc'] = pick(['18 and more'])
+    data['relation'] = pick(RELATIONS)
+    data['Class/ASD'] = pick(CLASSES)
+    df = pd.DataFrame(data)
+
+    # '?' markers in the source files become NaN on read
+    missing = rng.random(n_rows) < missing_rate
+    df.loc[missing, ['ethnicity', 'relation']] = np.nan
+    return df
+
+
+def clean_strings_apply(df):
+    """Previous string cleaning path: per-cell lambda, then country replace"""
+    string_cols = df.select_dtypes(include=['object']).columns
+    for col in string_cols:
+        df[col] = df[col].apply(lambda x: x.strip().lower() if pd.notna(x) else x)
+    if 'contry_of_res' in df.columns:
+        df['contry_of_res'] = df['contry_of_res'].replace(COUNTRY_LOOKUP)
+    return df
+
+
+def clean_strings_vectorized(df):
+    """Current string cleaning path (clean stage)"""
+    return normalize_strings(df, lookups={'contry_of_res': COUNTRY_LOOKUP})
+
+
+def time_call(func, df):
+    """Run func on a copy of df and return (seconds, result)"""
+    df = df.copy()
+    start = time.perf_counter()
+    result = func(df)
+    return time.perf_counter() - start, result
+
+
+def bench_string_cleaning(sizes, seed=0):
+    """Compare the apply and vectorized string cleaning paths"""
+    print("\nString cleaning: apply vs vectorized\n")
+    print(f"{'rows':>12} {'apply (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+
+    results = []
+    for n_rows in sizes:
+        df = make_synthetic_screening(n_rows, seed=seed)
+        apply_time, expected = time_call(clean_strings_apply, df)
+        vector_time, actual = time_call(clean_strings_vectorized, df)
+        pd.testing.assert_frame_equal(expected, actual)
+        del df, expected, actual
+
+        speedup = apply_time / vector_time if vector_time else float('inf')
+        print(f"{n_rows:>12,} {apply_time:>12.3f} {vector_time:>15.3f} {speedup:>8.1f}x")
+        results.append({
+            'rows': n_rows,
+            'apply_s': apply_time,
+            'vectorized_s': vector_time,
+            'speedup': speedup
+        })
+
+    return results
+
+
+def timed(func, *args, **kwargs):
+    """Return (seconds, result) of one call"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_columnar_output(sizes, seed=0):
+    """Compare file size, write and read time of CSV, Parquet and Arrow IPC output"""
+    import pyarrow.feather as feather
+
+    print("\nCleaned dataset output: CSV vs Parquet vs Arrow IPC\n")
+    print(f"{'rows':>12} {'format':>8} {'size (MB)':>10} {'write (s)':>10} {'read (s)':>9} {'mmap (s)':>9}")
+
+    results = []
+    for n_rows in sizes:
+        df = run_stages(make_synthetic_screening(n_rows, seed=seed), 'Adult')
+        with tempfile.TemporaryDirectory() as tmp:
+            for ext in ['csv', 'parquet', 'feather']:
+                path = os.path.join(tmp, f'clean.{ext}')
+                with contextlib.redirect_stdout(io.StringIO()):
+                    write_time, _ = timed(save_dataset, df, path)
+                read_time, _ = timed(read_dataset, path)
+                # Arrow-only read: memory-mapped, no conversion to pandas
+                mmap_time = None
+                if ext == 'feather':
+                    mmap_time, _ = timed(feather.read_table, path, memory_map=True)
+                size_mb = os.path.getsize(path) / (1024 * 1024)
+                mmap = f"{mmap_time:.3f}" if mmap_time is not None else '-'
+                print(f"{n_rows:>12,} {ext:>8} {size_mb:>10.2f} {write_time:>10.3f} {read_time:>9.3f} {mmap:>9}")
+                results.append({
+                    'rows': n_rows,
+                    'format': ext,
+                    'size_mb': size_mb,
+                    'write_s': write_time,
+                    'read_s': read_time,
+                    'mmap_read_s': mmap_time
+                })
+        del df
+
+    return results
+
+
+def bench_memory(sizes, seed=0):
+    """Compare frame memory under default dtypes and the declared compact schema"""
+    print("\nFrame memory: default dtypes vs declared schema\n")
+    print(f"{'rows':>12} {'frame':>8} {'default (MB)':>13} {'compact (MB)':>13} {'ratio':>7}")
+
+    results = []
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'raw.csv')
+            make_synthetic_screening(n_rows, seed=seed).to_csv(path, index=False, na_rep='?')
+            default_raw = pd.read_csv(path, na_values=['?'])
+            compact_raw = read_source(path)
+
+        compact_clean = run_stages(compact_raw.copy(), 'Adult')
+        # Previous output dtypes: int64 numbers and Python-object strings
+        default_clean = compact_clean.astype({
+            col: 'int64' if pd.api.types.is_integer_dtype(dtype) else object
+            for col, dtype in compact_clean.dtypes.items()
+        })
+
+        for frame, default, compact in [('raw', default_raw, compact_raw),
+                                        ('clean', default_clean, compact_clean)]:
+            default_mb = memory_usage_mb(default)
+            compact_mb = memory_usage_mb(compact)
+            ratio = default_mb / compact_mb
+            print(f"{n_rows:>12,} {frame:>8} {default_mb:>13.2f} {compact_mb:>13.2f} {ratio:>6.1f}x")
+            results.append({
+                'rows': n_rows,
+                'frame': frame,
+                'default_mb': default_mb,
+                'compact_mb': compact_mb
+            })
+        del default_raw, compact_raw, default_clean, compact_clean
+
+    return results
+
+
+def bench_load(sizes, batch_sizes, seed=0):
+    """Bulk load throughput into the SQLite stand-in at several batch sizes"""
+    print("\nBulk load into SQLite: executemany batch size\n")
+    print(f"{'rows':>12} {'batch':>8} {'time (s)':>9} {'rows/s':>12}")
+
+    results = []
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_file = os.path.join(tmp, 'clean.csv')
+            run_stages(make_synthetic_screening(n_rows, seed=seed), 'Adult').to_csv(data_file, index=False)
+            for batch_size in batch_sizes:
+                with SQLiteTarget(os.path.join(tmp, f'load_{batch_size}.db'), batch_size) as target:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        target.create_table()
+                        load_time, _ = timed(target.load, data_file)
+                    loaded = target.connection.execute(
+                        "SELECT COUNT(*) FROM autism_screening").fetchone()[0]
+
+                rate = loaded / load_time
+                print(f"{n_rows:>12,} {batch_size:>8,} {load_time:>9.3f} {rate:>12,.0f}")
+                results.append({
+                    'rows': loaded,
+                    'batch_size': batch_size,
+                    'load_s': load_time,
+                    'rows_per_s': rate
+                })
+
+    return results
+
+
+def bench_ingest(sizes, seed=0):
+    """Read time of a raw source CSV under each ingest engine"""
+    print(f"\nRaw CSV ingest engines ({os.cpu_count()} CPU(s))\n")
+    print(f"{'rows':>12} {'engine':>14} {'time (s)':>9} {'MB/s':>8} {'rows/s':>13} {'frame (MB)':>11}")
+
+    results = []
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Leading unnamed index column, like the adolescent source
+            path = os.path.join(tmp, 'raw.csv')
+            make_synthetic_screening(n_rows, seed=seed).to_csv(path, na_rep='?')
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+
+            # Previous reader: every column, nullable Int8 answers parsed by the C parser
+            runs = [('c (all columns)', lambda: pd.read_csv(path, na_values=['?'], dtype=RAW_DTYPES))]
+            runs += [(engine, functools.partial(read_source, path, engine=engine)) for engine in READ_ENGINES]
+            reference = None
+            for engine, read in runs:
+                seconds, df = timed(read)
+                if engine in READ_ENGINES:
+                    if reference is None:
+                        reference = df
+                    else:
+                        pd.testing.assert_frame_equal(df, reference, check_categorical=False)
+                frame_mb = memory_usage_mb(df)
+                print(f"{n_rows:>12,} {engine:>14} {seconds:>9.3f} {size_mb / seconds:>8.1f} "
+                      f"{n_rows / seconds:>13,.0f} {frame_mb:>11.2f}")
+                results.append({
+                    'rows': n_rows,
+                    'engine': engine,
+                    'cpus': os.cpu_count(),
+                    'seconds': seconds,
+                    'file_mb': size_mb,
+                    'frame_mb': frame_mb
+                })
+                del df
+            del reference
+
+    return results
+
+
+def bench_validation(sizes, seed=0):
+    """Rows checked per second by each validation rule"""
+    # Stop before the validate stage so the rules are timed on their own
+    stages = [stage for stage in TRANSFORM_STAGES if stage[0] != 'validate']
+    results = []
+    for n_rows in sizes:
+        df = run_stages(make_synthetic_screening(n_rows, seed=seed), 'Adult', stages=stages)
+        rule_report = {}
+        rule_violations(df, rule_report=rule_report)
+        print(f"\nValidation rules on {len(df):,} cleaned rows")
+        print_rule_report(rule_report)
+        for name, stats in rule_report.items():
+            results.append({'rows': stats['rows'], 'rule': name, 'seconds': stats['seconds']})
+        del df
+
+    return results
+
+
+def bench_scores(sizes, seed=0):
+    """Records/s of the bit-packed AQ-10 operations"""
+    print("\nBit-packed AQ-10 answers\n")
+    print(f"{'rows':>12} {'operation':<22} {'time (s)':>9} {'records/s':>15}")
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for n_rows in sizes:
+        scores = rng.integers(0, 2, (n_rows, Scores.N_QUESTIONS), dtype=np.uint8)
+        pack_time, codes = timed(Scores.pack_scores, scores)
+        operations = [
+            ('pack', pack_time),
+            ('popcount (result)', timed(Scores.popcount, codes)[0]),
+            ('nearest neighbours', timed(Scores.nearest_neighbours, codes, codes[0], 10)[0]),
+            ('pattern frequencies', timed(Scores.pattern_frequencies, codes)[0]),
+            ('unpacked sum (result)', timed(np.sum, scores, axis=1)[0])
+        ]
+        assert (Scores.popcount(codes) == scores.sum(axis=1)).all()
+        for operation, seconds in operations:
+            rate = n_rows / seconds if seconds else float('inf')
+            print(f"{n_rows:>12,} {operation:<22} {seconds:>9.4f} {rate:>15,.0f}")
+            results.append({'rows': n_rows, 'operation': operation, 'seconds': seconds})
+        del scores, codes
+
+    return results
+
+
+def write_synthetic_sources(directory, n_rows, seed=0):
+    """Write the three raw CSVs under their remote names, '?' for missing values
+
+    The adolescent file keeps the unnamed leading index column of the real one.
+    """
+    for i, (remote, filename) in enumerate(FILES):
+        df = make_synthetic_screening(max(1, round(n_rows * SOURCE_SHARES[filename])), seed=seed + i)
+        df.to_csv(os.path.join(directory, remote), na_rep='?', index='Adolescent' in filename)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(directory):
+    """Local HTTP stand-in for the download server; yields its base URL"""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# Runs a stage script as __main__ and, on exit, writes its peak RSS in MB to
+# the file named by argv[1]. VmHWM is used where available: ru_maxrss of a
+# child also counts the memory of the process that forked it.
+STAGE_RUNNER = """
+import atexit, os, runpy, sys
+
+peak_file, script = sys.argv[1], sys.argv[2]
+
+def write_peak():
+    peak_mb = None
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    peak_mb = int(line.split()[1]) / 1024
+    except OSError:
+        try:
+            import resource
+            scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        except ImportError:
+            pass
+    with open(peak_file, 'w') as f:
+        f.write('' if peak_mb is None else str(peak_mb))
+
+atexit.register(write_peak)
+sys.argv = sys.argv[2:]
+sys.path.insert(0, os.path.dirname(script))
+runpy.run_path(script, run_name='__main__')
+"""
+
+
+def run_measured(script, args, cwd, log_path):
+    """Run a stage script; returns (exit code, wall seconds, peak RSS in MB or None)"""
+    peak_file = f"{log_path}.peak"
+    cmd = [sys.executable, '-c', STAGE_RUNNER, peak_file, script, *args]
+    start = time.perf_counter()
+    with open(log_path, 'a', encoding='utf-8') as log:
+        code = subprocess.run(cmd, cwd=cwd, stdout=log, stderr=subprocess.STDOUT).returncode
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if os.path.exists(peak_file):
+        with open(peak_file) as f:
+            value = f.read()
+        peak_mb = float(value) if value else None
+        os.remove(peak_file)
+    return code, seconds, peak_mb
+
+
+def count_rows(path):
+    """Data rows of a CSV file"""
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f) - 1
+
+
+def git_commit():
+    """Short hash of the checked-out commit, None outside a git work tree"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ETL_DIR,
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def write_results(results, benchmark, path):
+    """Append result records to a JSON Lines file, tagged with the run's commit and host"""
+    run = {
+        'benchmark': benchmark,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform()
+    }
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in results:
+            f.write(json.dumps({**run, **record}) + '\n')
+    print(f"\n{len(results)} result(s) appended to {path}")
+
+
+def bench_stages(sizes, seed=0, transform_mode='batch'):
+    """Wall time, peak memory and rows/s of Extract.py, Transform.py and Load.py
+
+    Each size runs the real scripts in a scratch copy of AUTO_ETL: Extract
+    downloads synthetic raw files from a local HTTP server, Transform cleans
+    them and Load bulk loads the result into the SQLite stand-in.
+    """
+    print("\nETL stages on synthetic sources\n")
+    print(f"{'rows':>12} {'stage':<10} {'rows out':>10} {'time (s)':>9} {'peak RSS (MB)':>14} {'rows/s':>12}")
+
+    results = []
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            serve_dir = os.path.join(tmp, 'remote')
+            work_dir = os.path.join(tmp, 'AUTO_ETL')
+            os.makedirs(serve_dir)
+            os.makedirs(os.path.join(work_dir, 'data'))
+            shutil.copy(os.path.join(ETL_DIR, 'Autism_Screening.ctl'), work_dir)
+            write_synthetic_sources(serve_dir, n_rows, seed=seed)
+            log_path = os.path.join(tmp, 'stages.log')
+
+            with serve_directory(serve_dir) as base_url:
+                stages = [
+                    ('extract', ['Extract.py', '--base-url', base_url], None),
+                    ('transform', ['Transform.py', '--mode', transform_mode], 'data/Autism_test_clean.csv'),
+                    ('load', ['Load.py', '--backend', 'sqlite', '--database', 'data/benchmark.sqlite'], None)
+                ]
+                rows_in = sum(count_rows(os.path.join(serve_dir, remote)) for remote, _ in FILES)
+                for stage, (script, *args), output in stages:
+                    code, seconds, peak_mb = run_measured(os.path.join(CODE_DIR, script), args,
+                                                          work_dir, log_path)
+                    if code != 0:
+                        print(f"✗ {stage} failed with code {code}; see the log below\n")
+                        with open(log_path, encoding='utf-8') as log:
+                            print(log.read()[-2000:])
+                        return results
+                    rows_out = count_rows(os.path.join(work_dir, output)) if output else rows_in
+
+                    rate = rows_in / seconds
+                    peak = f"{peak_mb:.1f}" if peak_mb is not None else 'n/a'
+                    print(f"{n_rows:>12,} {stage:<10} {rows_out:>10,} {seconds:>9.3f} {peak:>14} {rate:>12,.0f}")
+                    results.append({
+                        'rows': rows_in,
+                        'stage': stage,
+                        'rows_out': rows_out,
+                        'wall_s': seconds,
+                        'peak_rss_mb': peak_mb,
+                        'rows_per_s': rate
+                    })
+                    # The load reads what the transform wrote
+                    rows_in = rows_out
+
+    return results
+
+
+def main():
+    """Run the selected benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('benchmark',
+                        choices=['strings', 'columnar', 'memory', 'ingest', 'load', 'rules', 'scores',
+                                 'stages'])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000],
+                        help='synthetic dataset sizes, e.g. --rows 1000000 10000000 50000000')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help='executemany batch sizes for the load benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--transform-mode', choices=['batch', 'stream', 'parallel'], default='batch',
+                        help='Transform.py --mode in the stages benchmark')
+    parser.add_argument('--results', default=None,
+                        help=f'append machine-readable results to this JSON Lines file '
+                             f'(stages benchmark default: {RESULTS_PATH})')
+    args = parser.parse_args()
+
+    if args.benchmark == 'strings':
+        results = bench_string_cleaning(args.rows, seed=args.seed)
+    elif args.benchmark == 'columnar':
+        results = bench_columnar_output(args.rows, seed=args.seed)
+    elif args.benchmark == 'memory':
+        results = bench_memory(args.rows, seed=args.seed)
+    elif args.benchmark == 'ingest':
+        results = bench_ingest(args.rows, seed=args.seed)
+    elif args.benchmark == 'load':
+        results = bench_load(args.rows, args.batch_sizes, seed=args.seed)
+    elif args.benchmark == 'rules':
+        results = bench_validation(args.rows, seed=args.seed)
+    elif args.benchmark == 'scores':
+        results = bench_scores(args.rows, seed=args.seed)
+    elif args.benchmark == 'stages':
+        results = bench_stages(args.rows, seed=args.seed, transform_mode=args.transform_mode)
+        args.results = args.results or RESULTS_PATH
+
+    if args.results and results:
+        write_results(results, args.benchmark, args.results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Cube.py
+Precomputed aggregate cube of the cleaned Autism Screening dataset
+
+The cube stores row counts, ASD-positive counts and score sums for every
+distinct combination of the analysis dimensions. It is materialized next to
+the cleaned CSV by Transform.py and, since every measure is a sum, updated
+by adding the aggregates of new rows instead of rescanning the dataset.
+CubeQuery answers group-by questions from the cube in microseconds.
+"""
+
+import argparse
+import itertools
+import os
+import time
+
+import pandas as pd
+
+
+DIMENSIONS = ['country', 'ethnicity', 'age_group', 'gender', 'jaundice']
+
+SCORE_COLUMNS = [f'a{i}_score' for i in range(1, 11)]
+
+MEASURES = ['rows', 'asd_positive', 'result_sum'] + [f'{col}_sum' for col in SCORE_COLUMNS]
+
+
+def cube_path(output_path):
+    """Cube file written next to a cleaned file"""
+    root, _ = os.path.splitext(output_path)
+    return f"{root}_cube.csv"
+
+
+def build_cube(df):
+    """Aggregate cleaned rows into the cube: one row per distinct dimension combination"""
+    measures = {
+        'rows': 1,
+        'asd_positive': df['class_asd'].astype('int64'),
+        'result_sum': df['result'].astype('int64')
+    }
+    for col in SCORE_COLUMNS:
+        measures[f'{col}_sum'] = df[col].astype('int64')
+    frame = pd.DataFrame(measures, index=df.index)
+    for dim in DIMENSIONS:
+        frame[dim] = df[dim].astype(str)
+    return frame.groupby(DIMENSIONS, sort=True)[MEASURES].sum().reset_index()
+
+
+def merge_cubes(*cubes):
+    """Add cubes together; every measure is a sum, so this equals the cube of all their rows"""
+    cubes = [cube for cube in cubes if cube is not None and len(cube)]
+    if not cubes:
+        return pd.DataFrame(columns=DIMENSIONS + MEASURES)
+    if len(cubes) == 1:
+        return cubes[0]
+    merged = pd.concat(cubes, ignore_index=True)
+    return merged.groupby(DIMENSIONS, sort=True)[MEASURES].sum().reset_index()
+
+
+def update_cube(cube, new_rows, replace_age_groups=None):
+    """Fold new cleaned rows into an existing cube
+
+    Cells of the age groups in replace_age_groups are dropped first, for a
+    source whose partition was re-transformed as a whole.
+    """
+    if replace_age_groups:
+        cube = cube[~cube['age_group'].isin(replace_age_groups)]
+    return merge_cubes(cube, build_cube(new_rows))
+
+
+def save_cube(cube, path):
+    """Write the cube as CSV"""
+    cube.to_csv(path, index=False)
+    print(f"Cube saved: {path} ({len(cube)} cells)")
+
+
+def load_cube(path):
+    """Read a cube written by save_cube"""
+    return pd.read_csv(path, dtype={dim: str for dim in DIMENSIONS}, keep_default_na=False)
+
+
+class CubeQuery:
+    """Group-by queries answered from the cube
+
+    The cube is rolled up to each requested set of dimensions once, into a
+    dict keyed by dimension values, and the rolled-up cells are indexed by
+    the values of the filtered dimensions; later queries of the same shape
+    are dictionary lookups.
+    """
+
+    def __init__(self, cube):
+        self.cube = cube
+        self.cuboids = {}
+        self.slices = {}
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_cube(path))
+
+    def cuboid(self, dims):
+        """Cube rolled up to dims: {tuple of values in DIMENSIONS order: measures}"""
+        key = tuple(dim for dim in DIMENSIONS if dim in dims)
+        if key not in self.cuboids:
+            if key:
+                rolled = self.cube.groupby(list(key), sort=True)[MEASURES].sum()
+                index = rolled.index if len(key) > 1 else [(value,) for value in rolled.index]
+                self.cuboids[key] = dict(zip(index, map(tuple, rolled.to_numpy().tolist())))
+            else:
+                self.cuboids[key] = {(): tuple(self.cube[MEASURES].sum().tolist())}
+        return key, self.cuboids[key]
+
+    def precompute(self):
+        """Roll the cube up to every combination of dimensions ahead of the queries"""
+        for size in range(len(DIMENSIONS) + 1):
+            for dims in itertools.combinations(DIMENSIONS, size):
+                self.cuboid(dims)
+        return self
+
+    def query(self, by=(), **filters):
+        """Measures grouped by the dimensions in by, over the rows matching filters
+
+        Returns {tuple of by values: {measure: value}}, e.g.
+        query(['country'], gender='f')[('jordan',)]['asd_positive'].
+        """
+        unknown = (set(by) | set(filters)) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown dimension(s): {', '.join(sorted(unknown))}")
+
+        key, cells = self.cuboid(set(by) | set(filters))
+        by_positions = [key.index(dim) for dim in by]
+        if not filters:
+            if list(by) == list(key):
+                return {values: dict(zip(MEASURES, measures)) for values, measures in cells.items()}
+            return {
+                tuple(values[i] for i in by_positions): dict(zip(MEASURES, measures))
+                for values, measures in cells.items()
+            }
+
+        if not by:
+            # A point query: a single lookup
+            measures = cells.get(tuple(filters[dim] for dim in key))
+            return {(): dict(zip(MEASURES, measures))} if measures else {}
+
+        filter_dims = tuple(dim for dim in key if dim in filters)
+        if (key, filter_dims) not in self.slices:
+            filter_positions = [key.index(dim) for dim in filter_dims]
+            index = {}
+            for values, measures in cells.items():
+                index.setdefault(tuple(values[i] for i in filter_positions), []).append((values, measures))
+            self.slices[(key, filter_dims)] = index
+        matches = self.slices[(key, filter_dims)].get(tuple(filters[dim] for dim in filter_dims), [])
+        return {
+            tuple(values[i] for i in by_positions): dict(zip(MEASURES, measures))
+            for values, measures in matches
+        }
+
+    def positive_rate(self, by=(), **filters):
+        """ASD-positive rate grouped by the dimensions in by"""
+        return {
+            values: measures['asd_positive'] / measures['rows']
+            for values, measures in self.query(by, **filters).items()
+        }
+
+
+def main():
+    """Answer one group-by question from the cube"""
+    parser = argparse.ArgumentParser(description='Query the Autism Screening aggregate cube')
+    parser.add_argument('--cube', default=cube_path('data/Autism_test_clean.csv'))
+    parser.add_argument('--by', nargs='*', default=[], choices=DIMENSIONS,
+                        help='dimensions to group by')
+    parser.add_argument('--where', nargs='*', default=[], metavar='DIMENSION=VALUE',
+                        help='filters, e.g. --where gender=f jaundice=yes')
+    args = parser.parse_args()
+    filters = dict(item.split('=', 1) for item in args.where)
+
+    cube = CubeQuery.from_file(args.cube)
+    cube.query(args.by, **filters)  # roll up once
+    start = time.perf_counter()
+    result = cube.query(args.by, **filters)
+    elapsed = time.perf_counter() - start
+
+    label = ', '.join(args.by) or 'all rows'
+    print(f"\n{label:<40} {'rows':>8} {'ASD+':>8} {'rate':>7} {'mean result':>12}")
+    for values, measures in sorted(result.items()):
+        name = ', '.join(values) or 'all rows'
+        rate = measures['asd_positive'] / measures['rows']
+        mean_result = measures['result_sum'] / measures['rows']
+        print(f"{name:<40} {measures['rows']:>8} {measures['asd_positive']:>8} "
+              f"{rate:>7.1%} {mean_result:>12.2f}")
+    print(f"\nQuery time: {elapsed * 1e6:.1f} µs ({len(cube.cube)} cube cells)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,205 @@
-import requests
+"""
+Extract.py
+Download the raw Autism Screening CSVs
+
+Files are fetched concurrently over a shared connection pool and streamed to
+disk in chunks. A partial download (.part file) is resumed with an HTTP Range
+request, conditional on the validators of the response it was written from
+(kept next to it in a .part.json file). The ETag / Last-Modified validators
+of every complete file are kept in the manifest so an unchanged file costs a
+single 304 response.
+"""
+
+import argparse
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
+from requests.adapters import HTTPAdapter
 
-if not os.path.exists('data'):
-    os.makedirs('data')
+from Manifest import load_manifest, save_manifest
 
-    
-# List of URLs and corresponding filenames
-urls = [
-    "https://github.com/shaheennamboori/CSV_dataset_for_autism_diagnostics/raw/master/Autism-Child-Data.csv",
-    "https://github.com/shaheennamboori/CSV_dataset_for_autism_diagnostics/raw/master/Autism-Adult_Data.csv",
-    "https://github.com/shaheennamboori/CSV_dataset_for_autism_diagnostics/raw/master/Autism-Adolescent-Data.csv"
-]
 
-filenames = [
-    "data/Autism-Child-Data.csv",
-    "data/Autism-Adult-Data.csv",
-    "data/Autism-Adolescent-Data.csv"
+BASE_URL = "https://github.com/shaheennamboori/CSV_dataset_for_autism_diagnostics/raw/master"
+
+# Remote file names and corresponding local filenames
+FILES = [
+    ("Autism-Child-Data.csv", "data/Autism-Child-Data.csv"),
+    ("Autism-Adult_Data.csv", "data/Autism-Adult-Data.csv"),
+    ("Autism-Adolescent-Data.csv", "data/Autism-Adolescent-Data.csv")
 ]
 
-# Download each file
-for url, filename in zip(urls, filenames):
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(filename, 'wb') as file:
-            file.write(response.content)
-        print(f"File '{filename}' downloaded successfully.")
-    else:
-        print(f"Failed to download file from '{url}'.")
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 30
+
+
+def make_session(pool_size):
+    """HTTP session whose connection pool is shared by all download threads"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=3)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def part_validators_path(part_path):
+    """Sidecar file holding the validators of the response a .part was written from"""
+    return f"{part_path}.json"
+
+
+def discard_part(part_path):
+    """Remove a .part file and its validators so the next request starts over"""
+    for path in (part_path, part_validators_path(part_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def response_validators(response):
+    return {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
+    }
+
+
+def if_range(validators):
+    """If-Range value resuming a .part, None when it cannot be resumed safely"""
+    # A weak ETag never matches If-Range, so fall back to Last-Modified
+    etag = validators.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return validators.get('last_modified')
+
+
+def content_range(response):
+    """(first byte, complete length) of the Content-Range header; None when unknown"""
+    match = re.match(r'bytes (?:(\d+)-\d+|\*)/(\d+|\*)', response.headers.get('Content-Range', ''))
+    if not match:
+        return None, None
+    first, length = match.groups()
+    return (int(first) if first else None), (int(length) if length != '*' else None)
+
+
+def download_file(session, url, filename, validators=None):
+    """Download url to filename; returns (status, validators)
+
+    status is 'downloaded', 'resumed', 'unchanged' or 'failed'. validators
+    holds the ETag / Last-Modified of the file now on disk.
+    """
+    validators = dict(validators or {})
+    part_path = f"{filename}.part"
+    headers = {}
+
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if offset:
+        # Only resume if the remote file is still the one the .part was
+        # started from; without a validator for it, start over
+        part_validators = load_manifest(part_validators_path(part_path))
+        if if_range(part_validators):
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = if_range(part_validators)
+        else:
+            discard_part(part_path)
+            offset = 0
+    if not offset and os.path.exists(filename):
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    restart = False
+    try:
+        with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 304:
+                return 'unchanged', validators
+
+            if response.status_code == 416 and offset:
+                # Nothing left past the .part: it is complete if it holds
+                # the whole remote file
+                _, length = content_range(response)
+                if length != offset:
+                    restart = True
+                status = 'resumed'
+            elif response.status_code == 206 and offset:
+                first, _ = content_range(response)
+                if first != offset:
+                    # Not the bytes following the .part
+                    restart = True
+                mode, status = 'ab', 'resumed'
+            elif response.status_code == 200:
+                # Server ignored the Range header, the file changed or there
+                # was no .part: start over, recording what the .part is
+                # written from before any byte of it
+                part_validators = response_validators(response)
+                save_manifest(part_validators, part_validators_path(part_path))
+                mode, status = 'wb', 'downloaded'
+            else:
+                return 'failed', validators
+
+            if response.status_code != 416 and not restart:
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        file.write(chunk)
+    except requests.RequestException:
+        # Keep the .part file so the next run can resume it
+        return 'failed', validators
+
+    if restart:
+        discard_part(part_path)
+        return download_file(session, url, filename, validators)
+
+    os.replace(part_path, filename)
+    discard_part(part_path)
+    return status, part_validators
+
+
+def download_all(files, base_url=BASE_URL, workers=None):
+    """Download every (remote name, local filename) pair concurrently"""
+    workers = workers or len(files)
+    manifest = load_manifest()
+    known = manifest.get('extract', {})
+
+    session = make_session(workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            filename: pool.submit(download_file, session, f"{base_url}/{remote}", filename,
+                                  known.get(filename))
+            for remote, filename in files
+        }
+        results = {filename: future.result() for filename, future in futures.items()}
+    session.close()
+
+    # Re-read in case another stage updated the manifest meanwhile
+    manifest = load_manifest()
+    extract = manifest.setdefault('extract', {})
+    for filename, (status, validators) in results.items():
+        if status == 'failed':
+            print(f"Failed to download file '{filename}'.")
+        elif status == 'unchanged':
+            print(f"File '{filename}' unchanged, skipped.")
+        else:
+            print(f"File '{filename}' {status} successfully.")
+        if status != 'failed':
+            extract[filename] = validators
+    save_manifest(manifest)
+
+    return all(status != 'failed' for status, _ in results.values())
+
+
+def main():
+    """Download the three screening datasets"""
+    parser = argparse.ArgumentParser(description='Download the Autism Screening CSVs')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help='base URL of the CSV files, e.g. a local stand-in server')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='concurrent downloads (default: one per file)')
+    args = parser.parse_args()
+
+    os.makedirs('data', exist_ok=True)
+    if not download_all(FILES, base_url=args.base_url.rstrip('/'), workers=args.workers):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
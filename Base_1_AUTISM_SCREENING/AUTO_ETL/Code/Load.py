@@ -1,108 +1,47 @@
 """
 Load.py
-Load cleaned data into Oracle database using SQL*Loader
+Load cleaned data into Oracle (or a SQLite / DuckDB target), in-process
+with bulk batches or through SQL*Loader
 """
 
+import argparse
 import os
 import subprocess
 import sys
-import cx_Oracle
+import tempfile
 
+from Manifest import load_manifest, save_manifest
+from Targets import STAGING_TABLE, TABLE_NAME, TARGETS, OracleTarget
 
-def create_table(username, password):
-    """Create table in Oracle before loading data"""
-    print("\nCreating table in Oracle...")
-    
-    try:
-        # Connect to Oracle
-        dsn = cx_Oracle.makedsn('localhost', 1521, service_name='XEPDB1')
-        connection = cx_Oracle.connect(username, password, dsn)
-        cursor = connection.cursor()
-        
-        # SQL script to execute
-        sql_script = """
-BEGIN
-   -- Drop table if exists
-   BEGIN
-      EXECUTE IMMEDIATE 'DROP TABLE autism_screening CASCADE CONSTRAINTS';
-   EXCEPTION
-      WHEN OTHERS THEN
-         IF SQLCODE != -942 THEN RAISE; END IF;
-   END;
-   
-   -- Drop sequence if exists
-   BEGIN
-      EXECUTE IMMEDIATE 'DROP SEQUENCE autism_screening_seq';
-   EXCEPTION
-      WHEN OTHERS THEN
-         IF SQLCODE != -2289 THEN RAISE; END IF;
-   END;
-   
-   -- Create sequence
-   EXECUTE IMMEDIATE 'CREATE SEQUENCE autism_screening_seq START WITH 1 INCREMENT BY 1';
-   
-   -- Create table
-   EXECUTE IMMEDIATE '
-   CREATE TABLE autism_screening (
-       id NUMBER PRIMARY KEY,
-       A1_Score NUMBER(1) CHECK (A1_Score BETWEEN 0 AND 1) NOT NULL,
-       A2_Score NUMBER(1) CHECK (A2_Score BETWEEN 0 AND 1) NOT NULL,
-       A3_Score NUMBER(1) CHECK (A3_Score BETWEEN 0 AND 1) NOT NULL,
-       A4_Score NUMBER(1) CHECK (A4_Score BETWEEN 0 AND 1) NOT NULL,
-       A5_Score NUMBER(1) CHECK (A5_Score BETWEEN 0 AND 1) NOT NULL,
-       A6_Score NUMBER(1) CHECK (A6_Score BETWEEN 0 AND 1) NOT NULL,
-       A7_Score NUMBER(1) CHECK (A7_Score BETWEEN 0 AND 1) NOT NULL,
-       A8_Score NUMBER(1) CHECK (A8_Score BETWEEN 0 AND 1) NOT NULL,
-       A9_Score NUMBER(1) CHECK (A9_Score BETWEEN 0 AND 1) NOT NULL,
-       A10_Score NUMBER(1) CHECK (A10_Score BETWEEN 0 AND 1) NOT NULL,
-       age NUMBER CHECK (age > 0 AND age < 150) NOT NULL,
-       gender CHAR(1) CHECK (gender IN (''m'', ''f'')) NOT NULL,
-       ethnicity VARCHAR2(50) NOT NULL,
-       jaundice VARCHAR2(3) CHECK (jaundice IN (''yes'', ''no'')) NOT NULL,
-       autism VARCHAR2(3) CHECK (autism IN (''yes'', ''no'')) NOT NULL,
-       country VARCHAR2(200) NOT NULL,
-       result NUMBER CHECK (result >= 0) NOT NULL,
-       relation VARCHAR2(50) NOT NULL,
-       Class_ASD NUMBER(1) CHECK (Class_ASD IN (0, 1)) NOT NULL,
-       age_group VARCHAR2(20) CHECK (age_group IN (''child'', ''adolescent'', ''adult'')) NOT NULL
-   )';
-   
-   -- Create trigger for auto-increment
-   EXECUTE IMMEDIATE '
-   CREATE OR REPLACE TRIGGER autism_screening_id 
-   BEFORE INSERT ON autism_screening 
-   FOR EACH ROW
-   BEGIN
-     SELECT autism_screening_seq.NEXTVAL INTO :new.id FROM dual;
-   END;';
-   
-END;
-"""
-        
-        cursor.execute(sql_script)
-        connection.commit()
-        cursor.close()
-        connection.close()
-        
-        print("✅ Table created successfully")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Error creating table: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return False
 
+OUTPUT_FILE = 'data/Autism_test_clean.csv'
+# SQL*Loader control file of a full load into the live table
+CONTROL_FILE = 'Autism_Screening.ctl'
+# Same columns as Autism_Screening.ctl but APPENDs, for delta loads
+DELTA_CONTROL_FILE = 'Autism_Screening_delta.ctl'
+# Direct-path load into the staging table of a --swap load
+STAGING_CONTROL_FILE = 'Autism_Screening_staging.ctl'
+
+def required_files(args):
+    """Data file and, for SQL*Loader, the control files the load will use"""
+    if not args.incremental:
+        if args.method != 'sqlldr':
+            return [args.data_file]
+        return [args.data_file, STAGING_CONTROL_FILE if args.swap else CONTROL_FILE]
+    # Delta loads go through the staging table; a full reload without
+    # --swap appends to the recreated live table
+    files = [OUTPUT_FILE]
+    if args.method == 'sqlldr':
+        files.append(STAGING_CONTROL_FILE)
+        if not args.swap:
+            files.append(DELTA_CONTROL_FILE)
+    return files
 
-def check_files_exist():
+
+def check_files_exist(required_files):
     """Check if required files exist"""
     print("Checking required files...")
     
-    required_files = [
-        'data/Autism_test_clean.csv',
-        'Autism_Screening.ctl'
-    ]
-    
     missing_files = []
     for file in required_files:
         if not os.path.exists(file):
@@ -119,16 +58,24 @@ def check_files_exist():
     return True
 
 
-def run_sqlldr(username, password, connection_string, control_file, log_file):
+def run_sqlldr(username, password, connection_string, control_file, log_file, data_file=None):
     """Execute SQL*Loader to load data into Oracle"""
     print("\nLoading data into Oracle database...")
     print(f"Control file: {control_file}")
     print(f"Log file: {log_file}")
     
-    cmd = f'sqlldr {username}/{password}@{connection_string} control={control_file} log={log_file}'
+    # Credentials go through a private parameter file rather than the
+    # command line, where any user could read them from the process list
+    with tempfile.NamedTemporaryFile('w', suffix='.par', delete=False) as parfile:
+        parfile.write(f"userid={username}/{password}@{connection_string}\n")
+    
+    cmd = ['sqlldr', f'parfile={parfile.name}', f'control={control_file}', f'log={log_file}']
+    if data_file:
+        print(f"Data file: {data_file}")
+        cmd.append(f'data={data_file}')
     
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True)
         
         if result.returncode == 0:
             print("\n✅ Data loaded successfully")
@@ -141,35 +88,166 @@ def run_sqlldr(username, password, connection_string, control_file, log_file):
     except Exception as e:
         print(f"\n✗ Error executing SQL*Loader: {str(e)}")
         return False
+    
+    finally:
+        os.remove(parfile.name)
+
+
+def partition_path(age_group):
+    """Cleaned partition written by Transform.py --mode incremental"""
+    return os.path.join('data', 'partitions', f"{age_group}.csv")
+
+
+def changed_partitions(manifest):
+    """Transform partitions whose content differs from what was last loaded"""
+    partitions = manifest.get('transform', {}).get('partitions', {})
+    loaded = manifest.get('load', {}).get('partitions', {})
+    return {
+        name: entry for name, entry in partitions.items()
+        if loaded.get(name) != entry['output']
+    }
+
+
+def full_load(target, data_file, load_file=None, swap=False):
+    """Rebuild the table from one cleaned file
+
+    With swap the file is loaded into a staging table that replaces the live
+    one by rename, so readers never see a missing or partial table.
+    """
+    if swap:
+        return target.load_staged([data_file], load_file)
+    load_file = load_file or target.load
+    return target.create_table() and load_file(data_file)
+
+
+def load_incremental(target, load_file=None, swap=False):
+    """Upsert only the age groups whose cleaned partition changed since the last load
+
+    load_file(data_file, table) appends one cleaned CSV to a table and
+    returns True on success; it defaults to the target's own bulk load.
+    A delta load replaces the changed age groups in one transaction, or,
+    with swap or a load_file committing on its own (SQL*Loader), stages
+    them next to the unchanged rows and publishes the staging table.
+    """
+    # SQL*Loader commits on its own and cannot share the delete's transaction
+    commits_alone = load_file is not None
+    load_file = load_file or target.load
+    manifest = load_manifest()
+    partitions = manifest.get('transform', {}).get('partitions', {})
+    if not partitions:
+        print("✗ No transform manifest found; run Transform.py --mode incremental first")
+        return False
+    
+    changed = changed_partitions(manifest)
+    loaded_by = manifest.get('load', {}).get('target')
+    if not changed and loaded_by == target.name:
+        print("No partition changed since the last load; nothing to do")
+        return True
+    
+    if loaded_by != target.name or len(changed) == len(partitions):
+        # First load into this target or everything changed: full rebuild
+        print("Full reload...")
+        success = full_load(target, OUTPUT_FILE, load_file, swap)
+    else:
+        age_groups = [entry['age_group'] for entry in changed.values()]
+        data_files = [partition_path(age_group) for age_group in age_groups]
+        print(f"Delta load of {len(changed)} partition(s): {', '.join(changed)}")
+        if swap or commits_alone:
+            success = target.load_staged(data_files, load_file, replaced_age_groups=age_groups)
+        else:
+            success = target.replace_age_groups(age_groups, data_files)
+    
+    if success:
+        manifest['load'] = {
+            'target': target.name,
+            'partitions': {name: entry['output'] for name, entry in partitions.items()}
+        }
+        save_manifest(manifest)
+    return success
+
+
+def make_target(args, username, password):
+    """Build the load target selected on the command line"""
+    if args.backend == 'oracle':
+        return OracleTarget(username, password, batch_size=args.batch_size)
+    return TARGETS[args.backend](args.database, batch_size=args.batch_size)
 
 
 def main():
     """Main load pipeline"""
-    print("\nAUTISM SCREENING DATA - LOAD TO ORACLE\n")
+    parser = argparse.ArgumentParser(description='Load cleaned Autism Screening data')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only reload the age groups whose cleaned data changed since the last load')
+    parser.add_argument('--method', choices=['bulk', 'sqlldr'], default='bulk',
+                        help='bulk loads in-process; sqlldr runs SQL*Loader (Oracle only)')
+    parser.add_argument('--batch-size', type=int, default=10_000,
+                        help='rows per executemany batch in bulk mode')
+    parser.add_argument('--backend', choices=sorted(TARGETS), default='oracle',
+                        help='load target; sqlite and duckdb load a local database file')
+    parser.add_argument('--database', default=None,
+                        help='database file for the sqlite / duckdb targets '
+                             '(default: data/autism_screening.<backend>)')
+    parser.add_argument('--swap', action='store_true',
+                        help='loads go to a staging table that is then renamed over the live one')
+    parser.add_argument('--data-file', default=OUTPUT_FILE,
+                        help='cleaned file for a full load; the duckdb target also reads .parquet')
+    args = parser.parse_args()
+    if args.database is None:
+        args.database = f"data/autism_screening.{args.backend}"
+    
+    print(f"\nAUTISM SCREENING DATA - LOAD TO {args.backend.upper()}\n")
      
     USERNAME = 'SYSTEM'
     PASSWORD = 'SYSTEM'
     CONNECTION_STRING = '//localhost:1521/XEPDB1'
-    CONTROL_FILE = 'Autism_Screening.ctl'
     LOG_FILE = 'load_data_Autism_Screening.log'
     
-    if not check_files_exist():
+    if args.method == 'sqlldr' and args.backend != 'oracle':
+        print("✗ SQL*Loader can only load the Oracle target")
+        sys.exit(1)
+    
+    if not check_files_exist(required_files(args)):
         print("\n✗ Load aborted: Missing required files")
         sys.exit(1)
     
-    print("Creating/Recreating table...")
-    create_table(USERNAME, PASSWORD)
+    load_file = None
+    if args.method == 'sqlldr':
+        def load_file(data_file, table=TABLE_NAME):
+            """Append one cleaned CSV to an Oracle table with SQL*Loader"""
+            control_file = STAGING_CONTROL_FILE if table == STAGING_TABLE else DELTA_CONTROL_FILE
+            return run_sqlldr(USERNAME, PASSWORD, CONNECTION_STRING, control_file, LOG_FILE,
+                              data_file=data_file)
     
-    print("Loading data...")
-    success = run_sqlldr(USERNAME, PASSWORD, CONNECTION_STRING, CONTROL_FILE, LOG_FILE)
+    with make_target(args, USERNAME, PASSWORD) as target:
+        if args.incremental:
+            success = load_incremental(target, load_file, swap=args.swap)
+        elif args.method == 'sqlldr' and not args.swap:
+            print("Creating/Recreating table...")
+            success = target.create_table()
+            
+            print("Loading data...")
+            if success:
+                success = run_sqlldr(USERNAME, PASSWORD, CONNECTION_STRING, CONTROL_FILE, LOG_FILE,
+                                     data_file=args.data_file)
+        else:
+            success = full_load(target, args.data_file, load_file, swap=args.swap)
+        
+        if success and not args.incremental:
+            # The table no longer matches the partitions recorded by the
+            # last incremental load; make the next incremental run a full
+            # reload
+            manifest = load_manifest()
+            if manifest.pop('load', None) is not None:
+                save_manifest(manifest)
     
     if success:
         print(f"\n✅ LOAD COMPLETED")
-        print(f"Check log: {LOG_FILE}\n")
     else:
         print(f"\n⚠️ LOAD COMPLETED WITH WARNINGS")
-        print(f"Check log: {LOG_FILE}\n")
+    if args.method == 'sqlldr':
+        print(f"Check log: {LOG_FILE}")
+    print()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
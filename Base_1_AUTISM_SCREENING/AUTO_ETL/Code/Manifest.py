@@ -0,0 +1,38 @@
+"""
+Manifest.py
+Content-hash manifest shared by the ETL stages to skip unchanged work
+"""
+
+import hashlib
+import json
+import os
+
+
+MANIFEST_PATH = 'data/manifest.json'
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's content, None if the file does not exist"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the manifest, or an empty one on first run"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest atomically so an interrupted run never leaves it half-written"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
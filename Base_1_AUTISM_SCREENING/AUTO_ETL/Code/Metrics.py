@@ -0,0 +1,164 @@
+"""
+Metrics.py
+Timing spans and structured metrics for the ETL stages
+
+Each span records wall time, rows in/out, bytes read/written and the peak
+RSS reached while it ran. Spans with the same name and dataset (e.g. the
+chunks of a streaming run) are summed, then printed as a table or written
+as JSON or Prometheus text format.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+SPAN_FIELDS = ['rows_in', 'rows_out', 'bytes_read', 'bytes_written', 'seconds']
+
+# Prometheus metric, span field and help text
+PROMETHEUS_METRICS = [
+    ('etl_span_seconds', 'seconds', 'Wall time spent in the span'),
+    ('etl_span_rows_in', 'rows_in', 'Rows entering the span'),
+    ('etl_span_rows_out', 'rows_out', 'Rows leaving the span'),
+    ('etl_span_bytes_read', 'bytes_read', 'Bytes read from files by the span'),
+    ('etl_span_bytes_written', 'bytes_written', 'Bytes written to files by the span'),
+    ('etl_span_peak_rss_bytes', 'peak_rss_bytes', 'Peak resident set size while the span ran')
+]
+
+
+def reset_peak_rss():
+    """Reset the kernel's RSS high-water mark (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None if unavailable"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, KB elsewhere
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return None
+
+
+def file_size(path):
+    """Size of a file in bytes, 0 if it does not exist"""
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class Metrics:
+    """Collects the spans of one pipeline run"""
+
+    def __init__(self):
+        self.spans = []
+        self.started = time.time()
+
+    def record(self, span, dataset=None, rows_in=0, rows_out=0, bytes_read=0, bytes_written=0,
+               seconds=0.0, peak_rss_mb=None):
+        """Add one finished span"""
+        self.spans.append({
+            'span': span,
+            'dataset': dataset,
+            'rows_in': rows_in,
+            'rows_out': rows_out,
+            'bytes_read': bytes_read,
+            'bytes_written': bytes_written,
+            'seconds': seconds,
+            'peak_rss_mb': peak_rss_mb
+        })
+
+    @contextlib.contextmanager
+    def span(self, span, dataset=None, rows_in=0):
+        """Time the enclosed block; set rows_out / bytes_* on the yielded dict"""
+        fields = {'rows_in': rows_in, 'rows_out': 0, 'bytes_read': 0, 'bytes_written': 0}
+        reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(span, dataset, seconds=time.perf_counter() - start,
+                        peak_rss_mb=peak_rss_mb(), **fields)
+
+    def extend(self, spans):
+        """Add spans recorded by another process"""
+        self.spans.extend(spans)
+
+    def summary(self):
+        """Spans summed by (span, dataset) in first-seen order; peak RSS is the maximum"""
+        totals = {}
+        for span in self.spans:
+            key = (span['span'], span['dataset'])
+            total = totals.get(key)
+            if total is None:
+                totals[key] = dict(span, count=1)
+                continue
+            total['count'] += 1
+            for field in SPAN_FIELDS:
+                total[field] += span[field]
+            if span['peak_rss_mb'] is not None:
+                total['peak_rss_mb'] = max(total['peak_rss_mb'] or 0, span['peak_rss_mb'])
+        return list(totals.values())
+
+    def to_json(self):
+        """Run metadata and summed spans as a JSON document"""
+        spans = self.summary()
+        return json.dumps({
+            'started': self.started,
+            'seconds': sum(span['seconds'] for span in spans),
+            'spans': spans
+        }, indent=2)
+
+    def to_prometheus(self):
+        """Summed spans in the Prometheus text exposition format"""
+        spans = self.summary()
+        lines = []
+        for metric, field, help_text in PROMETHEUS_METRICS:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for span in spans:
+                if field == 'peak_rss_bytes':
+                    if span['peak_rss_mb'] is None:
+                        continue
+                    value = int(span['peak_rss_mb'] * 1024 * 1024)
+                else:
+                    value = span[field]
+                labels = f'span="{span["span"]}"'
+                if span['dataset'] is not None:
+                    labels += f',dataset="{span["dataset"]}"'
+                lines.append(f"{metric}{{{labels}}} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write JSON, or Prometheus text format for a .prom / .txt path"""
+        prometheus = os.path.splitext(path)[1] in ('.prom', '.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus() if prometheus else self.to_json())
+        print(f"Metrics written: {path}")
+
+    def print_report(self):
+        """Print the summed spans as a table"""
+        print(f"\n{'span':<12} {'dataset':<12} {'rows in':>9} {'rows out':>9} {'read (MB)':>10} "
+              f"{'written (MB)':>13} {'time (s)':>9} {'peak RSS (MB)':>14}")
+        for span in self.summary():
+            rss = f"{span['peak_rss_mb']:.1f}" if span['peak_rss_mb'] is not None else 'n/a'
+            print(f"{span['span']:<12} {span['dataset'] or '-':<12} {span['rows_in']:>9} "
+                  f"{span['rows_out']:>9} {span['bytes_read'] / (1024 * 1024):>10.2f} "
+                  f"{span['bytes_written'] / (1024 * 1024):>13.2f} {span['seconds']:>9.4f} {rss:>14}")
@@ -0,0 +1,119 @@
+"""
+Scores.py
+Bit-packed AQ-10 answers
+
+The ten binary answers A1-A10 of a respondent are packed into one 10-bit
+code (bit i-1 holds A{i}), stored in a uint16 array. Popcounts, Hamming
+distances and pattern frequencies then become table lookups and bincounts
+over that array.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+
+SCORE_COLUMNS = [f'a{i}_score' for i in range(1, 11)]
+
+N_QUESTIONS = len(SCORE_COLUMNS)
+N_PATTERNS = 1 << N_QUESTIONS
+
+# Value of each answer's bit: A1 -> 1, A2 -> 2, ... A10 -> 512
+BIT_WEIGHTS = (1 << np.arange(N_QUESTIONS)).astype(np.uint16)
+
+# Set bits of every 10-bit code
+POPCOUNT = np.array([bin(code).count('1') for code in range(N_PATTERNS)], dtype=np.uint8)
+
+
+def pack_scores(scores):
+    """Pack an (n, 10) array of 0/1 answers, or a frame with the score columns, into uint16 codes"""
+    if isinstance(scores, pd.DataFrame):
+        scores = scores[SCORE_COLUMNS].to_numpy(dtype=np.uint8)
+    return np.asarray(scores, dtype=np.uint8) @ BIT_WEIGHTS
+
+
+def unpack_scores(codes):
+    """(n, 10) uint8 answers of packed codes"""
+    codes = np.asarray(codes, dtype=np.uint16)
+    return ((codes[:, None] >> np.arange(N_QUESTIONS, dtype=np.uint16)) & 1).astype(np.uint8)
+
+
+def pattern_string(code):
+    """Answers of one code as 'A1..A10' digits, e.g. '1100110100'"""
+    return ''.join(str((int(code) >> i) & 1) for i in range(N_QUESTIONS))
+
+
+def popcount(codes):
+    """Number of 1 answers per code, i.e. the AQ-10 result"""
+    return POPCOUNT[codes]
+
+
+def hamming_distances(codes, code):
+    """Number of differing answers between every code and one code"""
+    return POPCOUNT[codes ^ np.uint16(code)]
+
+
+def nearest_neighbours(codes, code, k=10):
+    """Indices of the k codes closest to code in Hamming distance, closest first"""
+    distances = hamming_distances(codes, code)
+    k = min(k, len(codes))
+    nearest = np.argpartition(distances, k - 1)[:k]
+    return nearest[np.argsort(distances[nearest], kind='stable')]
+
+
+def pattern_frequencies(codes):
+    """Count of every answer pattern, indexed by code"""
+    return np.bincount(codes, minlength=N_PATTERNS)
+
+
+def top_patterns(codes, n=10):
+    """The n most frequent answer patterns as a frame"""
+    counts = pattern_frequencies(codes)
+    top = np.argsort(counts, kind='stable')[::-1][:n]
+    top = top[counts[top] > 0]
+    return pd.DataFrame({
+        'pattern': [pattern_string(code) for code in top],
+        'result': POPCOUNT[top],
+        'count': counts[top],
+        'share': counts[top] / len(codes)
+    })
+
+
+def main():
+    """Summarize the answer patterns of the cleaned dataset"""
+    parser = argparse.ArgumentParser(description='Bit-packed AQ-10 answer patterns')
+    parser.add_argument('--input', default='data/Autism_test_clean.csv')
+    parser.add_argument('--respondent', type=int, default=0,
+                        help='row whose nearest neighbours are listed')
+    parser.add_argument('-k', type=int, default=5, help='neighbours to list')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    start = time.perf_counter()
+    codes = pack_scores(df)
+    elapsed = time.perf_counter() - start
+    print(f"\nPacked {len(codes)} respondents into {codes.nbytes} bytes in {elapsed * 1e3:.3f} ms")
+
+    mismatches = int((popcount(codes) != df['result'].to_numpy()).sum())
+    if mismatches:
+        print(f"⚠️ {mismatches} row(s) with a result different from the number of 1 answers")
+    else:
+        print("✅ result equals the popcount of every row")
+
+    print("\nMost frequent answer patterns (A1..A10):")
+    print(top_patterns(codes).to_string(index=False))
+
+    code = codes[args.respondent]
+    neighbours = nearest_neighbours(codes, code, args.k + 1)
+    neighbours = neighbours[neighbours != args.respondent][:args.k]
+    print(f"\nNearest neighbours of row {args.respondent} ({pattern_string(code)}):")
+    for row in neighbours:
+        print(f"  row {row:>5}  {pattern_string(codes[row])}  "
+              f"distance {hamming_distances(codes[row:row + 1], code)[0]}  "
+              f"class_asd {df['class_asd'].iat[row]}")
+
+
+if __name__ == "__main__":
+    main()
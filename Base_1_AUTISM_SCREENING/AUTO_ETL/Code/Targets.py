@@ -0,0 +1,616 @@
+"""
+Targets.py
+Interchangeable load targets (Oracle, SQLite, DuckDB) for the cleaned
+Autism Screening dataset
+"""
+
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+try:
+    import cx_Oracle
+except ImportError:  # only needed for the Oracle target
+    cx_Oracle = None
+
+try:
+    import duckdb
+except ImportError:  # only needed for the DuckDB target
+    duckdb = None
+
+
+TABLE_NAME = 'autism_screening'
+# A staged load fills STAGING_TABLE, then renames it over TABLE_NAME; the
+# previous table is kept as RETIRED_TABLE until the swap has committed
+STAGING_TABLE = f'{TABLE_NAME}_stage'
+RETIRED_TABLE = f'{TABLE_NAME}_old'
+# Oracle DDL commits implicitly, so a swap there cannot be two renames in a
+# transaction: TABLE_NAME becomes a synonym for one of these tables, and a
+# swap repoints it at the other in a single statement
+SLOT_TABLES = (f'{TABLE_NAME}_a', f'{TABLE_NAME}_b')
+
+# Table definition shared by every target and by the transform's
+# validation rules: (column, Oracle type, portable type, check or None),
+# where a check is a (kind, argument) pair of CHECK_SQL
+TABLE_SPEC = [
+    (f'a{i}_score', 'NUMBER(1)', 'INTEGER', ('between', (0, 1)))
+    for i in range(1, 11)
+] + [
+    ('age', 'NUMBER', 'INTEGER', ('open_range', (0, 150))),
+    ('gender', 'CHAR(1)', 'VARCHAR', ('isin', ['m', 'f'])),
+    ('ethnicity', 'VARCHAR2(50)', 'VARCHAR', None),
+    ('jaundice', 'VARCHAR2(3)', 'VARCHAR', ('isin', ['yes', 'no'])),
+    ('autism', 'VARCHAR2(3)', 'VARCHAR', ('isin', ['yes', 'no'])),
+    ('country', 'VARCHAR2(200)', 'VARCHAR', None),
+    ('result', 'NUMBER', 'INTEGER', ('at_least', 0)),
+    ('relation', 'VARCHAR2(50)', 'VARCHAR', None),
+    ('class_asd', 'NUMBER(1)', 'INTEGER', ('isin', [0, 1])),
+    ('age_group', 'VARCHAR2(20)', 'VARCHAR', ('isin', ['child', 'adolescent', 'adult']))
+]
+
+# Loaded columns, in the order of the cleaned CSV and the control files
+LOAD_COLUMNS = [column for column, _, _, _ in TABLE_SPEC]
+
+
+def sql_literal(value):
+    return f"'{value}'" if isinstance(value, str) else str(value)
+
+
+# CHECK condition of each kind of check, from the column and the argument
+CHECK_SQL = {
+    'between': lambda column, bounds: f"{column} BETWEEN {bounds[0]} AND {bounds[1]}",
+    'open_range': lambda column, bounds: f"{column} > {bounds[0]} AND {column} < {bounds[1]}",
+    'at_least': lambda column, low: f"{column} >= {low}",
+    'isin': lambda column, allowed: f"{column} IN ({', '.join(map(sql_literal, allowed))})"
+}
+
+
+def check_sql(column, check):
+    """CHECK condition of a TABLE_SPEC check"""
+    kind, argument = check
+    return CHECK_SQL[kind](column, argument)
+
+
+def char_length(oracle_type):
+    """Declared length of a CHAR / VARCHAR2 type, None for other types"""
+    match = re.fullmatch(r'(?:CHAR|VARCHAR2)\((\d+)\)', oracle_type)
+    return int(match.group(1)) if match else None
+
+
+def table_ddl(id_column, oracle_types=False, table=TABLE_NAME, constraints=True):
+    """CREATE TABLE statement with the NOT NULL and CHECK constraints of the Oracle DDL
+
+    Without constraints only the column types are declared, for a staging
+    table whose constraints are added after the load.
+    """
+    lines = [f"    {id_column}"]
+    for column, oracle_type, portable_type, check in TABLE_SPEC:
+        line = f"    {column} {oracle_type if oracle_types else portable_type}"
+        if constraints:
+            line += " NOT NULL"
+            if check:
+                line += f" CHECK ({check_sql(column, check)})"
+        lines.append(line)
+    return f"CREATE TABLE {table} (\n" + ",\n".join(lines) + "\n)"
+
+
+def insert_statement(paramstyle, table=TABLE_NAME):
+    """INSERT of all LOAD_COLUMNS with positional binds in the driver's paramstyle"""
+    if paramstyle == 'numeric':
+        binds = ', '.join(f':{i + 1}' for i in range(len(LOAD_COLUMNS)))
+    else:
+        binds = ', '.join('?' for _ in LOAD_COLUMNS)
+    return f"INSERT INTO {table} ({', '.join(LOAD_COLUMNS)}) VALUES ({binds})"
+
+
+def bulk_load(connection, data_file, insert_sql, batch_size=10_000, batch_errors=False,
+              commit=True):
+    """Insert a cleaned CSV with array-bound executemany batches in one transaction
+
+    With batch_errors (Oracle) rows violating a constraint are reported and
+    skipped instead of aborting the batch, like SQL*Loader's bad file.
+    With commit=False the rows are left in the caller's open transaction.
+    Returns True when every row was loaded.
+    """
+    print(f"\nBulk loading {data_file} (batch size {batch_size})...")
+
+    cursor = connection.cursor()
+    rows = 0
+    rejected = 0
+    start = time.perf_counter()
+
+    try:
+        for chunk in pd.read_csv(data_file, chunksize=batch_size):
+            batch = list(chunk[LOAD_COLUMNS].itertuples(index=False, name=None))
+            if batch_errors:
+                cursor.executemany(insert_sql, batch, batcherrors=True)
+                errors = cursor.getbatcherrors()
+                for error in errors[:5]:
+                    print(f"✗ Row {rows + error.offset + 1} rejected: {error.message}")
+                rejected += len(errors)
+            else:
+                cursor.executemany(insert_sql, batch)
+            rows += len(batch)
+        if commit:
+            connection.commit()
+    except Exception as e:
+        if commit:
+            connection.rollback()
+        print(f"\n✗ Error during bulk load: {str(e)}")
+        return False
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - start
+    loaded = rows - rejected
+    report_throughput(loaded, elapsed, rejected)
+
+    if rejected:
+        print(f"\n⚠️ {rejected} row(s) rejected")
+        return False
+    print("\n✅ Data loaded successfully")
+    return True
+
+
+def report_throughput(loaded, elapsed, rejected=0):
+    """Print rows loaded and rows/s"""
+    rate = loaded / elapsed if elapsed else float('inf')
+    print(f"Rows loaded: {loaded}, rejected: {rejected}")
+    print(f"Load time: {elapsed:.3f}s ({rate:,.0f} rows/s)")
+
+
+class LoadTarget:
+    """Interface of a load backend
+
+    Every target creates the table with the shared constraints, replaces
+    age groups for delta loads and bulk loads a cleaned file in one
+    transaction.
+    """
+
+    name = None
+
+    def __init__(self, batch_size=10_000):
+        self.batch_size = batch_size
+        self.connection = None
+
+    def connect(self):
+        raise NotImplementedError
+
+    def create_table(self, table=TABLE_NAME, constraints=True):
+        """(Re)create the table; targets that cannot add constraints to an
+        existing table ignore constraints=False and check rows during the load"""
+        raise NotImplementedError
+
+    def load(self, data_file, table=TABLE_NAME, commit=True):
+        """Append a cleaned CSV (or Parquet, where supported) to the table
+
+        With commit=False the rows join the transaction opened by begin().
+        """
+        raise NotImplementedError
+
+    def begin(self):
+        """Open a transaction; sqlite3 and cx_Oracle open one on the first DML"""
+
+    def enable_constraints(self, table):
+        """Add the constraints left out by create_table(constraints=False)"""
+        return True
+
+    def table_exists(self, table):
+        raise NotImplementedError
+
+    def drop_table(self, table):
+        self.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def publish(self, staging):
+        """Rename the staging table over the live one in one transaction"""
+        live_exists = self.table_exists(TABLE_NAME)
+        try:
+            self.execute("BEGIN TRANSACTION")
+            if live_exists:
+                self.execute(f"ALTER TABLE {TABLE_NAME} RENAME TO {RETIRED_TABLE}")
+            self.execute(f"ALTER TABLE {staging} RENAME TO {TABLE_NAME}")
+            self.connection.commit()
+            return True
+
+        except Exception as e:
+            self.connection.rollback()
+            print(f"✗ Error publishing {staging}: {str(e)}")
+            return False
+
+    def load_staged(self, data_files, load_file=None, replaced_age_groups=None):
+        """Load data_files into a staging table, then swap it in for the live table
+
+        Readers keep querying the previous table, complete, until the swap.
+        For a delta load, replaced_age_groups lists the age groups the files
+        hold: the staging table starts with the live rows of every other age
+        group. load_file(data_file, table) defaults to the target's own bulk
+        load. Load and publish times are reported separately.
+        """
+        load_file = load_file or self.load
+        print(f"\nStaged load into {STAGING_TABLE}...")
+
+        start = time.perf_counter()
+        success = (self.create_table(STAGING_TABLE, constraints=False)
+                   and (replaced_age_groups is None
+                        or self.copy_live_rows(STAGING_TABLE, replaced_age_groups))
+                   and all(load_file(data_file, table=STAGING_TABLE) for data_file in data_files)
+                   and self.enable_constraints(STAGING_TABLE))
+        load_time = time.perf_counter() - start
+        if not success:
+            self.drop_table(STAGING_TABLE)
+            print(f"✗ Staged load failed; {TABLE_NAME} left unchanged")
+            return False
+
+        start = time.perf_counter()
+        published = self.publish(STAGING_TABLE)
+        publish_time = time.perf_counter() - start
+        if published:
+            self.drop_table(RETIRED_TABLE)
+            print(f"✅ {STAGING_TABLE} published as {TABLE_NAME}")
+        print(f"Staging load time: {load_time:.3f}s, publish time: {publish_time:.3f}s")
+        return published
+
+    def copy_live_rows(self, table, age_groups):
+        """Copy the live rows of every age group but age_groups into table"""
+        columns = ', '.join(['id'] + LOAD_COLUMNS)
+        binds = ', '.join(self.bind(i) for i in range(len(age_groups)))
+        try:
+            copied = self.execute_count(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {TABLE_NAME} "
+                f"WHERE age_group NOT IN ({binds})", list(age_groups))
+            self.connection.commit()
+            print(f"Rows kept from {TABLE_NAME}: {copied}")
+            return True
+
+        except Exception as e:
+            self.connection.rollback()
+            print(f"✗ Error copying rows from {TABLE_NAME}: {str(e)}")
+            return False
+
+    def replace_age_groups(self, age_groups, data_files):
+        """Delete the rows of the given age groups and append their reloaded files
+
+        The delete and the appends commit together, so readers never see the
+        age groups missing and a failed append leaves the table unchanged.
+        """
+        print(f"\nReplacing rows for age group(s): {', '.join(age_groups)}")
+
+        try:
+            self.begin()
+            binds = ', '.join(self.bind(i) for i in range(len(age_groups)))
+            deleted = self.execute_count(
+                f"DELETE FROM {TABLE_NAME} WHERE age_group IN ({binds})", list(age_groups))
+            print(f"Rows deleted: {deleted}")
+            success = all(self.load(data_file, commit=False) for data_file in data_files)
+
+        except Exception as e:
+            print(f"✗ Error deleting rows: {str(e)}")
+            success = False
+
+        if success:
+            self.connection.commit()
+        else:
+            self.connection.rollback()
+            print(f"✗ Delta load rolled back; {TABLE_NAME} left unchanged")
+        return success
+
+    def bind(self, position):
+        """Placeholder of the given positional bind"""
+        return '?'
+
+    def execute(self, sql, params=()):
+        """Execute one statement"""
+        self.execute_count(sql, params)
+
+    def execute_count(self, sql, params=()):
+        """Execute a DML statement and return the number of rows it affected"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OracleTarget(LoadTarget):
+    """Oracle XE through cx_Oracle, with array-bound executemany and batch errors"""
+
+    name = 'oracle'
+
+    def __init__(self, username, password, batch_size=10_000):
+        super().__init__(batch_size)
+        self.username = username
+        self.password = password
+
+    def connect(self):
+        if cx_Oracle is None:
+            raise ImportError("The Oracle target needs the cx_Oracle package (pip install cx_Oracle)")
+        dsn = cx_Oracle.makedsn('localhost', 1521, service_name='XEPDB1')
+        self.connection = cx_Oracle.connect(self.username, self.password, dsn)
+        return self.connection
+
+    def bind(self, position):
+        return f':{position + 1}'
+
+    def create_table(self, table=TABLE_NAME, constraints=True):
+        """Create table in Oracle before loading data"""
+        print(f"\nCreating table {table} in Oracle...")
+
+        # The identity column hands out cached ids without a per-row trigger
+        # round trip to a sequence
+        id_column = 'id NUMBER GENERATED BY DEFAULT AS IDENTITY (CACHE 1000)'
+        if constraints:
+            id_column += ' PRIMARY KEY'
+        ddl = table_ddl(id_column, oracle_types=True, table=table, constraints=constraints)
+        sql_script = f"""
+BEGIN
+   -- Drop table if exists
+   BEGIN
+      EXECUTE IMMEDIATE 'DROP TABLE {table} CASCADE CONSTRAINTS PURGE';
+   EXCEPTION
+      WHEN OTHERS THEN
+         IF SQLCODE != -942 THEN RAISE; END IF;
+   END;
+
+   -- Drop the synonym left by a staged load (see publish)
+   BEGIN
+      EXECUTE IMMEDIATE 'DROP SYNONYM {table}';
+   EXCEPTION
+      WHEN OTHERS THEN
+         IF SQLCODE != -1434 THEN RAISE; END IF;
+   END;
+
+   -- Drop the sequence used by the former per-row id trigger
+   BEGIN
+      EXECUTE IMMEDIATE 'DROP SEQUENCE autism_screening_seq';
+   EXCEPTION
+      WHEN OTHERS THEN
+         IF SQLCODE != -2289 THEN RAISE; END IF;
+   END;
+
+   EXECUTE IMMEDIATE '{ddl.replace("'", "''")}';
+END;
+"""
+
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(sql_script)
+            self.connection.commit()
+            cursor.close()
+            if table == TABLE_NAME:
+                # The tables behind the dropped synonym
+                for slot in SLOT_TABLES:
+                    self.drop_table(slot)
+
+            print("✅ Table created successfully")
+            return True
+
+        except Exception as e:
+            print(f"✗ Error creating table: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    def load(self, data_file, table=TABLE_NAME, commit=True):
+        return bulk_load(self.connection, data_file, insert_statement('numeric', table),
+                         self.batch_size, batch_errors=True, commit=commit)
+
+    def copy_live_rows(self, table, age_groups):
+        """Copy the live rows, then move the identity past their ids"""
+        if not super().copy_live_rows(table, age_groups):
+            return False
+        try:
+            self.execute(f"ALTER TABLE {table} MODIFY id "
+                         "GENERATED BY DEFAULT AS IDENTITY (START WITH LIMIT VALUE)")
+            return True
+
+        except Exception as e:
+            print(f"✗ Error restarting the ids of {table}: {str(e)}")
+            return False
+
+    def enable_constraints(self, table):
+        """Validate the loaded rows once and build the primary key index"""
+        print(f"Adding constraints to {table}...")
+        not_null = ', '.join(f"{column} NOT NULL" for column in LOAD_COLUMNS)
+        checks = ', '.join(f"CHECK ({check_sql(column, check)})"
+                           for column, _, _, check in TABLE_SPEC if check)
+        try:
+            self.execute(f"ALTER TABLE {table} MODIFY ({not_null})")
+            self.execute(f"ALTER TABLE {table} ADD ({checks}, PRIMARY KEY (id))")
+            return True
+
+        except Exception as e:
+            print(f"✗ Loaded rows violate a constraint: {str(e)}")
+            return False
+
+    def table_exists(self, table):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM user_tables WHERE table_name = :1", [table.upper()])
+            return cursor.fetchone()[0] > 0
+        finally:
+            cursor.close()
+
+    def synonym_table(self, synonym):
+        """Table a synonym points to, None if there is no such synonym"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT table_name FROM user_synonyms WHERE synonym_name = :1",
+                           [synonym.upper()])
+            row = cursor.fetchone()
+            return row[0].lower() if row else None
+        finally:
+            cursor.close()
+
+    def publish(self, staging):
+        """Repoint the TABLE_NAME synonym from the live slot table to staging
+
+        staging is first renamed to the free slot, which no reader uses. The
+        switch itself is one CREATE OR REPLACE SYNONYM, so readers see the
+        previous table or the new one and never a missing one. The previous
+        slot then becomes RETIRED_TABLE.
+        """
+        current = self.synonym_table(TABLE_NAME)
+        slot = SLOT_TABLES[1] if current == SLOT_TABLES[0] else SLOT_TABLES[0]
+        try:
+            self.drop_table(slot)
+            self.drop_table(RETIRED_TABLE)
+            self.execute(f"ALTER TABLE {staging} RENAME TO {slot}")
+            if current is None and self.table_exists(TABLE_NAME):
+                # First staged load over a plain table: it has to leave the
+                # name to the synonym, the only moment without a live table
+                self.execute(f"ALTER TABLE {TABLE_NAME} RENAME TO {RETIRED_TABLE}")
+                try:
+                    self.execute(f"CREATE SYNONYM {TABLE_NAME} FOR {slot}")
+                except Exception:
+                    self.execute(f"ALTER TABLE {RETIRED_TABLE} RENAME TO {TABLE_NAME}")
+                    raise
+            else:
+                self.execute(f"CREATE OR REPLACE SYNONYM {TABLE_NAME} FOR {slot}")
+
+        except Exception as e:
+            print(f"✗ Error publishing {staging}: {str(e)}")
+            return False
+
+        if current is not None:
+            try:
+                self.execute(f"ALTER TABLE {current} RENAME TO {RETIRED_TABLE}")
+            except Exception as e:
+                # Still locked by a reader; the next publish drops it as the free slot
+                print(f"⚠️ {current} not retired: {str(e)}")
+        return True
+
+    def drop_table(self, table):
+        self.execute(f"""
+BEGIN
+   EXECUTE IMMEDIATE 'DROP TABLE {table} CASCADE CONSTRAINTS PURGE';
+EXCEPTION
+   WHEN OTHERS THEN
+      IF SQLCODE != -942 THEN RAISE; END IF;
+END;
+""")
+
+
+class SQLiteTarget(LoadTarget):
+    """SQLite database file, a local stand-in for Oracle"""
+
+    name = 'sqlite'
+
+    def __init__(self, database, batch_size=10_000):
+        super().__init__(batch_size)
+        self.database = database
+
+    def connect(self):
+        self.connection = sqlite3.connect(self.database)
+        return self.connection
+
+    def create_table(self, table=TABLE_NAME, constraints=True):
+        # SQLite cannot add constraints to an existing table
+        print(f"\nCreating table {table} in SQLite...")
+        self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+        self.connection.execute(table_ddl('id INTEGER PRIMARY KEY', table=table))
+        self.connection.commit()
+        print("✅ Table created successfully")
+        return True
+
+    def load(self, data_file, table=TABLE_NAME, commit=True):
+        return bulk_load(self.connection, data_file, insert_statement('qmark', table),
+                         self.batch_size, commit=commit)
+
+    def table_exists(self, table):
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [table]
+        ).fetchone() is not None
+
+
+class DuckDBTarget(LoadTarget):
+    """DuckDB database file; loads CSV or Parquet with a single INSERT ... SELECT"""
+
+    name = 'duckdb'
+
+    def __init__(self, database, batch_size=10_000):
+        super().__init__(batch_size)
+        self.database = database
+
+    def connect(self):
+        if duckdb is None:
+            raise ImportError("The DuckDB target needs the duckdb package (pip install duckdb)")
+        self.connection = duckdb.connect(self.database)
+        return self.connection
+
+    def create_table(self, table=TABLE_NAME, constraints=True):
+        # DuckDB cannot add constraints to an existing table. Ids are numbered
+        # by the load rather than a sequence, which a renamed table would
+        # keep depending on
+        print(f"\nCreating table {table} in DuckDB...")
+        self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+        self.connection.execute(table_ddl('id BIGINT PRIMARY KEY', table=table))
+        print("✅ Table created successfully")
+        return True
+
+    def begin(self):
+        self.connection.execute("BEGIN TRANSACTION")
+
+    def execute(self, sql, params=()):
+        self.connection.execute(sql, params)
+
+    def execute_count(self, sql, params=()):
+        # DuckDB returns the affected row count as the statement's result
+        return self.connection.execute(sql, params).fetchone()[0]
+
+    def table_exists(self, table):
+        return self.connection.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_name = ?", [table]
+        ).fetchone() is not None
+
+    def load(self, data_file, table=TABLE_NAME, commit=True):
+        """Let DuckDB scan the file itself; the whole insert is one transaction"""
+        print(f"\nBulk loading {data_file}...")
+        if data_file.endswith('.parquet'):
+            reader = 'read_parquet(?)'
+        else:
+            # Declared types, or the sniffer reads yes / no as BOOLEAN
+            types = ', '.join(f"'{column}': '{portable_type}'"
+                              for column, _, portable_type, _ in TABLE_SPEC)
+            reader = f"read_csv(?, header = true, types = {{{types}}})"
+        columns = ', '.join(LOAD_COLUMNS)
+        start = time.perf_counter()
+        try:
+            if commit:
+                self.begin()
+            loaded = self.connection.execute(
+                f"INSERT INTO {table} (id, {columns}) "
+                f"SELECT (SELECT COALESCE(MAX(id), 0) FROM {table}) + row_number() OVER (), {columns} "
+                f"FROM {reader}",
+                [data_file]).fetchone()[0]
+            if commit:
+                self.connection.execute("COMMIT")
+        except Exception as e:
+            if commit:
+                self.connection.execute("ROLLBACK")
+            print(f"\n✗ Error during bulk load: {str(e)}")
+            return False
+        report_throughput(loaded, time.perf_counter() - start)
+        print("\n✅ Data loaded successfully")
+        return True
+
+
+TARGETS = {
+    'oracle': OracleTarget,
+    'sqlite': SQLiteTarget,
+    'duckdb': DuckDBTarget
+}
@@ -2,28 +2,167 @@
 Transform.py
 Data cleaning and transformation pipeline for Autism Screening datasets
 """
-import sys
-print("PYTHON UTILISÉ :", sys.executable)
-
 import warnings
 warnings.filterwarnings('ignore')
 
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import io
 import pandas as pd
 import numpy as np
 import os
+import time
+
+from Cube import build_cube, cube_path, load_cube, merge_cubes, save_cube, update_cube
+from Manifest import MANIFEST_PATH, file_digest, load_manifest, save_manifest
+from Metrics import Metrics, file_size, peak_rss_mb, reset_peak_rss
+from Targets import TABLE_SPEC, char_length
+
+
+SOURCES = [
+    ('Child', 'data/Autism-Child-Data.csv'),
+    ('Adolescent', 'data/Autism-Adolescent-Data.csv'),
+    ('Adult', 'data/Autism-Adult-Data.csv')
+]
+
+OUTPUT_PATH = 'data/Autism_test_clean.csv'
+
+# Cleaned rows of each source, kept between incremental runs. A partition
+# is reused only if this file's digest matches the one it was written with,
+# so a change to the stages re-transforms every source
+PARTITION_DIR = 'data/partitions'
+
+COLUMNS_TO_DROP = ['unnamed:_0', 'used_app_before', 'age_desc']
+
+COLUMN_TYPOS = {
+    'jundice': 'jaundice',
+    'austim': 'autism'
+}
+
+SCORE_COLUMNS = [f'a{i}_score' for i in range(1, 11)]
+
+# Declared dtypes of the raw CSV columns, applied by read_csv so frames are
+# compact from the start: nullable int8 answers (a '?' becomes <NA>),
+# float32 age/result and categories for every low-cardinality string column
+RAW_DTYPES = {f'A{i}_Score': 'Int8' for i in range(1, 11)}
+RAW_DTYPES.update({
+    'age': 'float32',
+    'result': 'float32',
+    'gender': 'category',
+    'ethnicity': 'category',
+    'jundice': 'category',
+    'austim': 'category',
+    'contry_of_res': 'category',
+    'used_app_before': 'category',
+    'age_desc': 'category',
+    'relation': 'category',
+    'Class/ASD': 'category'
+})
+
+
+# CSV ingest engines: 'c' is the pandas C parser, 'pyarrow' the multithreaded
+# Arrow reader and 'threads' parses line-aligned byte ranges of the file with
+# the C parser in a thread pool. The C parser converts nullable Int8 columns
+# through a slow per-value path, so for 'c' and 'threads' the answers are
+# parsed as float32 and wrapped as Int8 afterwards.
+READ_ENGINES = ['c', 'pyarrow', 'threads']
+
+
+def source_usecols(path):
+    """Raw columns of a source CSV that drop_stage would keep, so the others are never parsed"""
+    header = pd.read_csv(path, nrows=0).columns
+    names = standardize_columns(pd.DataFrame(columns=header)).columns
+    return [raw for raw, name in zip(header, names) if name not in COLUMNS_TO_DROP]
+
+
+def to_nullable_int8(df):
+    """Wrap the float32 answer columns of a C-parsed frame as Int8, <NA> where missing"""
+    for col, dtype in RAW_DTYPES.items():
+        if dtype == 'Int8' and col in df.columns:
+            values = df[col].to_numpy()
+            missing = np.isnan(values)
+            df[col] = pd.arrays.IntegerArray(np.where(missing, 0, values).astype(np.int8), missing)
+    return df
+
+
+def read_csv_threaded(path, workers=None, **kwargs):
+    """Parse a CSV in line-aligned byte ranges with the C parser in a thread pool
+
+    The parser releases the GIL while tokenizing, so ranges are parsed in
+    parallel. The screening files have no quoted newlines, so every newline
+    ends a row.
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data = f.read()
+
+    bounds = [0]
+    step = max(1, len(data) // (workers * 4))
+    while bounds[-1] < len(data):
+        end = data.find(b'\n', bounds[-1] + step)
+        bounds.append(len(data) if end == -1 else end + 1)
+    ranges = list(zip(bounds, bounds[1:]))
+    if not ranges:
+        return pd.read_csv(io.BytesIO(header), **kwargs)
+
+    def parse(byte_range):
+        start, end = byte_range
+        return pd.read_csv(io.BytesIO(header + data[start:end]), **kwargs)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(parse, ranges))
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(unify_categories(frames), ignore_index=True)
 
 
-def load_data():
+def read_source(path, engine='c', **kwargs):
+    """Read one raw screening CSV with the declared schema, skipping the dropped columns
+
+    chunksize (stream mode) is only supported by the 'c' engine.
+    """
+    usecols = source_usecols(path)
+    dtype = {col: RAW_DTYPES[col] for col in usecols if col in RAW_DTYPES}
+    if engine == 'pyarrow':
+        return pd.read_csv(path, na_values=['?'], dtype=dtype, usecols=usecols, engine='pyarrow',
+                           **kwargs)
+
+    dtype = {col: 'float32' if kind == 'Int8' else kind for col, kind in dtype.items()}
+    if engine == 'threads':
+        return to_nullable_int8(read_csv_threaded(path, na_values=['?'], dtype=dtype,
+                                                  usecols=usecols, **kwargs))
+    if engine != 'c':
+        raise ValueError(f"Unknown CSV engine: {engine} (expected one of {', '.join(READ_ENGINES)})")
+    reader = pd.read_csv(path, na_values=['?'], dtype=dtype, usecols=usecols, **kwargs)
+    if kwargs.get('chunksize'):
+        return (to_nullable_int8(chunk) for chunk in reader)
+    return to_nullable_int8(reader)
+
+
+def memory_usage_mb(df):
+    """Deep memory usage of a frame in MB"""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def load_data(metrics=None, engine='c'):
     """Load the three autism screening datasets"""
-    print("Loading data...")
+    print(f"Loading data ({engine} engine)...")
+    if metrics is None:
+        metrics = Metrics()
     
-    child_df = pd.read_csv('data/Autism-Child-Data.csv', na_values=['?'])
-    adolescent_df = pd.read_csv('data/Autism-Adolescent-Data.csv', na_values=['?'])
-    adult_df = pd.read_csv('data/Autism-Adult-Data.csv', na_values=['?'])
+    frames = []
+    for dataset_name, path in SOURCES:
+        with metrics.span('load', dataset_name) as span:
+            df = read_source(path, engine=engine)
+            span['rows_out'] = len(df)
+            span['bytes_read'] = file_size(path)
+        frames.append(df)
+    child_df, adolescent_df, adult_df = frames
     
-    print(f"Child dataset loaded: {child_df.shape}")
-    print(f"Adolescent dataset loaded: {adolescent_df.shape}")
-    print(f"Adult dataset loaded: {adult_df.shape}")
+    print(f"Child dataset loaded: {child_df.shape}, {memory_usage_mb(child_df):.3f} MB")
+    print(f"Adolescent dataset loaded: {adolescent_df.shape}, {memory_usage_mb(adolescent_df):.3f} MB")
+    print(f"Adult dataset loaded: {adult_df.shape}, {memory_usage_mb(adult_df):.3f} MB")
     
     return child_df, adolescent_df, adult_df
 
@@ -33,138 +172,754 @@ def standardize_columns(df):
     df.columns = df.columns.str.lower().str.replace(' ', '_').str.replace('-', '_').str.replace('/', '_')
     # Rename contry_of_res to country 
     if 'contry_of_res' in df.columns:
-        df = df.rename(columns={'contry_of_res': 'country'})
+        df.rename(columns={'contry_of_res': 'country'}, inplace=True)
     return df
 
 
-def drop_unnecessary_columns(df, columns_to_drop):
-    """Drop specified columns if they exist"""
-    existing_cols = [col for col in columns_to_drop if col in df.columns]
-    if existing_cols:
-        df = df.drop(columns=existing_cols)
+# Canonical spellings applied after strip/lowercase, keyed by column
+COUNTRY_LOOKUP = {
+    'americansamoa': 'american samoa',
+    'viet nam': 'vietnam',
+    'u.s. outlying islands': 'united states'
+}
+
+ETHNICITY_LOOKUP = {
+    'other': 'others',
+    'white european': 'white-european'
+}
+
+DEFAULT_LOOKUPS = {
+    'country': COUNTRY_LOOKUP,
+    'ethnicity': ETHNICITY_LOOKUP
+}
+
+
+def normalize_values(series, lookup=None):
+    """Strip, lowercase and canonicalize a string column.
+
+    The column is factorized first so the .str kernels only run over the
+    distinct values; the cleaned uniques are then broadcast back through the
+    codes. Missing values are kept as NaN. Categorical columns stay
+    categorical and only their categories are cleaned.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    cleaned = pd.Series(uniques, dtype=object).str.strip().str.lower()
+    if lookup:
+        cleaned = cleaned.replace(lookup)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Cleaning can merge categories ('Others'/'others'), so re-factorize
+        # the cleaned categories and remap the codes
+        remap, categories = pd.factorize(cleaned)
+        remap = np.append(remap, -1)
+        return pd.Series(pd.Categorical.from_codes(remap[codes], categories),
+                         index=series.index, name=series.name)
+    # codes == -1 marks missing values and picks the trailing NaN
+    values = np.append(cleaned.to_numpy(dtype=object), np.nan)
+    return pd.Series(values[codes], index=series.index, name=series.name)
+
+
+def normalize_strings(df, columns=None, lookups=None):
+    """Vectorized string cleaning for every object and categorical column.
+
+    lookups maps a column name to a {raw: canonical} table; it defaults to
+    DEFAULT_LOOKUPS and can be replaced to plug in other canonicalizations.
+    """
+    if lookups is None:
+        lookups = DEFAULT_LOOKUPS
+    if columns is None:
+        columns = df.select_dtypes(include=['object', 'category']).columns
+    for col in columns:
+        df[col] = normalize_values(df[col], lookups.get(col))
     return df
 
 
-def clean_dataset(df, dataset_name):
-    """Clean individual dataset"""
-    print(f"\nCleaning {dataset_name} dataset...")
-    
-    df = df.copy()
-    initial_rows = len(df)
-    
-    # Fix column name typos
-    df = df.rename(columns={
-        'jundice': 'jaundice',
-        'austim': 'autism'
-    })
-    print(f"Column names corrected")
-    
-    # Remove duplicates
-    df = df.drop_duplicates()
-    duplicates_removed = initial_rows - len(df)
-    print(f"Duplicates removed: {duplicates_removed}")
-    
-    # Clean string values (strip whitespace, lowercase)
-    string_cols = df.select_dtypes(include=['object']).columns
-    for col in string_cols:
-        df[col] = df[col].apply(lambda x: x.strip().lower() if pd.notna(x) else x)
-    print(f"String values cleaned")
-    
-    # Standardize country names
-    if 'country' in df.columns:
-        df['country'] = df['country'].replace({
-            'americansamoa': 'american samoa',
-            'viet nam': 'vietnam',
-            'u.s. outlying islands': 'united states'
-        })
-    print(f"Country names standardized")
-    
-    # Add age_group identifier
-    df['age_group'] = dataset_name.lower()
-    print(f"Added age_group column: {dataset_name.lower()}")
-    print(f"Final rows: {len(df)}")
-    
+def map_target(series):
+    """Map the yes/no target to an int8 0/1 column, unknown values to 0"""
+    # On a categorical this maps the categories only; the float cast turns
+    # both categorical and object results into a plain numeric column
+    return series.map({'yes': 1, 'no': 0}).astype('float32').fillna(0).astype('int8')
+
+
+# ---------------------------------------------------------------------------
+# Single-pass staged pipeline
+#
+# Stages take (df, ctx) and return the frame. They modify it in place where
+# pandas allows and never take defensive copies; all row filters (duplicates,
+# missing values, age outliers) are fused into one mask and applied with a
+# single take, so each frame is materialized once after loading.
+# ---------------------------------------------------------------------------
+
+def standardize_stage(df, ctx):
+    """Normalize column names and fix the jundice/austim typos"""
+    df = standardize_columns(df)
+    df.rename(columns=COLUMN_TYPOS, inplace=True)
     return df
 
 
-def handle_missing_values(df, dataset_name):
-    """Remove rows with missing values"""
-    print(f"\nHandling missing values for {dataset_name}...")
-    
-    df = df.copy()
-    initial_rows = len(df)
-    initial_missing = df.isnull().sum().sum()
-    
-    print(f"Initial missing values: {initial_missing}")
-    
-    # Drop rows with any missing values
-    df = df.dropna()
-    
-    rows_removed = initial_rows - len(df)
-    print(f"Rows removed: {rows_removed}")
-    print(f"Final rows: {len(df)}")
-    
+def drop_stage(df, ctx):
+    """Drop columns that are not part of the output schema"""
+    existing_cols = [col for col in COLUMNS_TO_DROP if col in df.columns]
+    if existing_cols:
+        df.drop(columns=existing_cols, inplace=True)
     return df
 
 
-def convert_data_types(df, dataset_name):
-    """Convert columns to appropriate data types"""
-    print(f"\nConverting data types for {dataset_name}...")
-    
-    df = df.copy()
-    
-    # Convert screening question columns (A1-A10) to integer
+def row_filter_mask(df, ctx):
+    """Rows kept by duplicate removal, missing value handling and the age filter"""
+    dedup_index = ctx.get('dedup_index')
+    if dedup_index is not None:
+        keep = ~dedup_index.mark_duplicates(df)
+    else:
+        keep = ~df.duplicated().to_numpy()
+    keep &= df.notna().all(axis=1).to_numpy()
+    if 'age' in df.columns:
+        # convert_stage truncates age to int before comparing with 150
+        age = pd.to_numeric(df['age'], errors='coerce').to_numpy()
+        with np.errstate(invalid='ignore'):
+            keep &= np.trunc(age) <= 150
+    return keep
+
+
+def filter_stage(df, ctx):
+    """Apply all row filters with a single take"""
+    keep = row_filter_mask(df, ctx)
+    if keep.all():
+        return df
+    return df.take(np.flatnonzero(keep))
+
+
+def clean_stage(df, ctx):
+    """Normalize string values and tag the age group"""
+    normalize_strings(df, lookups=ctx.get('lookups'))
+    df['age_group'] = pd.Categorical.from_codes(
+        np.zeros(len(df), dtype='int8'), [ctx['dataset_name'].lower()])
+    return df
+
+
+def convert_stage(df, ctx):
+    """Cast scores, result, age and the target to their final types"""
     score_cols = [col for col in df.columns if col.startswith('a') and '_score' in col]
     for col in score_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-    print(f"Converted {len(score_cols)} score columns to int")
-    
-    # Convert result to integer
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int8')
     if 'result' in df.columns:
-        df['result'] = pd.to_numeric(df['result'], errors='coerce').fillna(0).astype(int)
-        print(f"result converted to int")
-    
-    # Convert age to integer
+        df['result'] = pd.to_numeric(df['result'], errors='coerce').fillna(0).astype('int8')
     if 'age' in df.columns:
-        initial_rows = len(df)
-        df['age'] = pd.to_numeric(df['age'], errors='coerce').astype(int)
-        print(f"age converted to int")
-        # Remove rows where age is greater than 150
-        df = df[df['age'] <= 150].copy()
-        rows_removed = initial_rows - len(df)
-        if rows_removed > 0:
-            print(f"Rows with age > 150 removed: {rows_removed}")
-    
-    # Convert target variable (Class/ASD) to binary integer (0/1)
+        df['age'] = pd.to_numeric(df['age'], errors='coerce').astype('int16')
     target_col = [col for col in df.columns if 'class' in col or 'asd' in col]
     if target_col:
         col = target_col[0]
-        df[col] = df[col].map({'yes': 1, 'no': 0})
-        df[col] = df[col].fillna(0).astype(int)
-        print(f"{col} converted to binary int (0=No, 1=Yes)")
-    
+        df[col] = map_target(df[col])
     return df
 
 
-def merge_datasets(child_df, adolescent_df, adult_df):
+# ---------------------------------------------------------------------------
+# Validation rules
+#
+# Vectorized copies of the NOT NULL / CHECK constraints and the CHAR /
+# VARCHAR2 lengths of the autism_screening table, derived from
+# Targets.TABLE_SPEC. The validate stage quarantines rows breaking a rule to
+# a reject file, instead of them surfacing as SQL*Loader .bad rows after the
+# load. As in SQL, a CHECK rule passes NULLs; the not_null rule rejects them.
+# ---------------------------------------------------------------------------
+
+def within_length(values, length):
+    """Values whose UTF-8 encoding fits in length bytes (Oracle's default length semantics)"""
+    # Measured once per distinct value; codes == -1 (missing) pick the trailing True
+    codes, uniques = pd.factorize(values)
+    fits = pd.Series(uniques, dtype=object).str.encode('utf-8').str.len().to_numpy() <= length
+    return pd.Series(np.append(fits, True)[codes], index=values.index)
+
+
+RULE_CHECKS = {
+    'not_null': lambda values, _: values.notna(),
+    'isin': lambda values, allowed: values.isin(allowed),
+    'between': lambda values, bounds: (values >= bounds[0]) & (values <= bounds[1]),
+    'open_range': lambda values, bounds: (values > bounds[0]) & (values < bounds[1]),
+    'at_least': lambda values, low: values >= low,
+    'max_length': within_length
+}
+
+
+def table_rules(table_spec=TABLE_SPEC):
+    """One rule per CHECK constraint and per declared string length, after not_null"""
+    rules = [('not_null', None, 'not_null', None)]
+    for column, oracle_type, _, check in table_spec:
+        if check:
+            kind, argument = check
+            rules.append((column, [column], kind, argument))
+        length = char_length(oracle_type)
+        if length:
+            rules.append((f'{column}_length', [column], 'max_length', length))
+    return rules
+
+
+# (rule, columns (None: every column), check, argument)
+VALIDATION_RULES = table_rules()
+
+
+def rule_violations(df, rules=None, rule_report=None):
+    """Evaluate the rules on df; returns (rule names, rows x rules violation matrix)
+
+    Per-rule rows checked, violations and time are accumulated in rule_report.
+    """
+    if rules is None:
+        rules = VALIDATION_RULES
+
+    names = []
+    violations = np.zeros((len(df), len(rules)), dtype=bool)
+    for i, (name, columns, check, argument) in enumerate(rules):
+        columns = df.columns if columns is None else [col for col in columns if col in df.columns]
+        start = time.perf_counter()
+        passed = np.ones(len(df), dtype=bool)
+        for col in columns:
+            passed &= RULE_CHECKS[check](df[col], argument).to_numpy(dtype=bool, na_value=True)
+        violations[:, i] = ~passed
+        elapsed = time.perf_counter() - start
+
+        names.append(name)
+        if rule_report is not None:
+            stats = rule_report.setdefault(name, {'rows': 0, 'violations': 0, 'seconds': 0.0})
+            stats['rows'] += len(df)
+            stats['violations'] += int(violations[:, i].sum())
+            stats['seconds'] += elapsed
+
+    return names, violations
+
+
+def validate_stage(df, ctx):
+    """Quarantine rows breaking a validation rule into ctx['rejects']"""
+    names, violations = rule_violations(df, rule_report=ctx.get('rule_report'))
+    bad = violations.any(axis=1)
+    if not bad.any():
+        return df
+
+    rejects = df.take(np.flatnonzero(bad))
+    rejects['rejected_by'] = [
+        ';'.join(name for name, failed in zip(names, row) if failed)
+        for row in violations[bad]
+    ]
+    if ctx.get('rejects') is not None:
+        ctx['rejects'].append(rejects)
+    return df.take(np.flatnonzero(~bad))
+
+
+def reject_path(output_path):
+    """Reject file written next to a cleaned file"""
+    root, _ = os.path.splitext(output_path)
+    return f"{root}_rejects.csv"
+
+
+def write_rejects(rejects, path):
+    """Write the quarantined rows, or remove a stale reject file when there are none"""
+    if not rejects:
+        if os.path.exists(path):
+            os.remove(path)
+        return 0
+    df = pd.concat(rejects)
+    df.to_csv(path, index=False)
+    print(f"⚠️ {len(df)} row(s) rejected by validation rules: {path}")
+    return len(df)
+
+
+def merge_rule_report(rule_report, other):
+    """Add the per-rule stats of other into rule_report"""
+    for name, stats in other.items():
+        total = rule_report.setdefault(name, {'rows': 0, 'violations': 0, 'seconds': 0.0})
+        for key in total:
+            total[key] += stats[key]
+    return rule_report
+
+
+def print_rule_report(rule_report):
+    """Print rows checked, violations and throughput of every rule"""
+    print(f"\n{'rule':<20} {'rows':>10} {'violations':>11} {'time (s)':>9} {'rows/s':>14}")
+    for name, stats in rule_report.items():
+        rate = stats['rows'] / stats['seconds'] if stats['seconds'] else float('inf')
+        print(f"{name:<20} {stats['rows']:>10} {stats['violations']:>11} "
+              f"{stats['seconds']:>9.4f} {rate:>14,.0f}")
+
+
+TRANSFORM_STAGES = [
+    ('standardize', standardize_stage),
+    ('drop', drop_stage),
+    ('filter', filter_stage),
+    ('clean', clean_stage),
+    ('convert', convert_stage),
+    ('validate', validate_stage),
+]
+
+
+def run_stages(df, dataset_name, stages=None, metrics=None, **ctx):
+    """Run df through the staged pipeline, recording a span per stage in metrics"""
+    if stages is None:
+        stages = TRANSFORM_STAGES
+    ctx['dataset_name'] = dataset_name
+
+    for stage_name, stage in stages:
+        rows_in = len(df)
+        reset_peak_rss()
+        start = time.perf_counter()
+        df = stage(df, ctx)
+        elapsed = time.perf_counter() - start
+        if metrics is not None:
+            metrics.record(stage_name, dataset_name, rows_in=rows_in, rows_out=len(df),
+                           seconds=elapsed, peak_rss_mb=peak_rss_mb())
+
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Streaming mode
+#
+# Sources are read in fixed-size chunks and every chunk goes through the same
+# stages as the batch pipeline. Duplicate removal stays global through a
+# DedupIndex of 64-bit row hashes kept in a sorted uint64 array, so memory is
+# bounded by the chunk size plus 8 bytes per distinct row seen (twice that
+# while a chunk's new hashes are merged in).
+# ---------------------------------------------------------------------------
+
+class DedupIndex:
+    """Sorted array of the hashes of rows already seen, shared across chunks"""
+
+    def __init__(self):
+        self.seen = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.seen)
+
+    @staticmethod
+    def row_hashes(df):
+        """64-bit hash per row, independent of the chunk's inferred dtypes"""
+        # A chunk with a missing value infers float64 where another infers
+        # int64; hash numbers as float64 so 1 and 1.0 collide as intended
+        numeric = df.select_dtypes(include=['number']).columns
+        if len(numeric):
+            df = df.astype({col: 'float64' for col in numeric})
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    def mark_duplicates(self, df):
+        """Boolean array flagging rows seen earlier in this or a previous chunk"""
+        hashes = self.row_hashes(df)
+        seen = self.seen
+        duplicated = pd.Series(hashes).duplicated().to_numpy()
+        if len(seen):
+            positions = np.searchsorted(seen, hashes)
+            duplicated |= seen[np.minimum(positions, len(seen) - 1)] == hashes
+        # The new hashes are distinct and not in seen: merge them in sorted
+        new = np.sort(hashes[~duplicated])
+        self.seen = np.insert(seen, np.searchsorted(seen, new), new)
+        return duplicated
+
+
+class CsvSink:
+    """Append chunks to a single CSV file, writing the header once"""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.columns = None
+        self.rows = 0
+
+    def write(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+            df.to_csv(self.output_path, index=False, mode='w')
+        else:
+            df.reindex(columns=self.columns).to_csv(
+                self.output_path, index=False, mode='a', header=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.columns is None:
+            # No rows survived cleaning; still leave an empty file behind
+            open(self.output_path, 'w').close()
+
+
+class ArrowSink:
+    """Append chunks to a Parquet or Arrow IPC file with the fixed schema"""
+
+    def __init__(self, output_path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.output_path = output_path
+        self.rows = 0
+        self.schema = arrow_schema()
+        # An IPC file allows one dictionary per field, extended only by
+        # deltas, so each dictionary column is encoded against a vocabulary
+        # that grows append-only across chunks
+        self.vocabularies = {
+            field.name: [] for field in self.schema if pa.types.is_dictionary(field.type)
+        }
+        if output_format(output_path) == 'parquet':
+            self.writer = pq.ParquetWriter(output_path, self.schema, compression='zstd')
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self.writer = pa.ipc.new_file(output_path, self.schema, options=options)
+
+    def encode(self, df):
+        """Build a record table whose dictionaries extend the previous chunk's"""
+        import pyarrow as pa
+
+        columns = []
+        for field in self.schema:
+            values = df[field.name]
+            if field.name not in self.vocabularies:
+                columns.append(pa.array(values, type=field.type))
+                continue
+            vocabulary = self.vocabularies[field.name]
+            known = pd.Index(vocabulary)
+            vocabulary.extend(v for v in pd.unique(values) if v not in known)
+            indices = pd.Index(vocabulary).get_indexer(values)
+            columns.append(pa.DictionaryArray.from_arrays(
+                pa.array(indices, type=field.type.index_type), pa.array(vocabulary, type=pa.string())))
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+    def write(self, df):
+        self.writer.write_table(self.encode(df))
+        self.rows += len(df)
+
+    def close(self):
+        self.writer.close()
+
+
+def make_sink(output_path):
+    """Streaming sink matching the output file extension"""
+    if output_format(output_path) == 'csv':
+        return CsvSink(output_path)
+    return ArrowSink(output_path)
+
+
+class StreamValidator:
+    """Accumulate the validate_dataset checks chunk by chunk"""
+
+    def __init__(self):
+        self.missing_total = 0
+        self.duplicates = 0
+        self.target_col = None
+        self.target_counts = pd.Series(dtype='int64')
+        self.countries = set()
+        self.dedup_index = DedupIndex()
+
+    def update(self, df):
+        self.missing_total += int(df.isnull().sum().sum())
+        self.duplicates += int(self.dedup_index.mark_duplicates(df).sum())
+        if self.target_col is None:
+            self.target_col = [col for col in df.columns if 'class' in col or 'asd' in col][0]
+        self.target_counts = self.target_counts.add(
+            df[self.target_col].value_counts(), fill_value=0).astype('int64')
+        if 'country' in df.columns:
+            self.countries.update(df['country'].unique())
+
+    def report(self):
+        """Print the same summary as validate_dataset and return validity"""
+        print("\nValidating dataset...")
+        if self.target_col is not None:
+            print(f"Target variable ({self.target_col}) distribution:")
+            print(self.target_counts.sort_values(ascending=False))
+            print(f"Unique countries: {len(self.countries)}")
+
+        is_valid = (self.missing_total == 0 and self.duplicates == 0)
+        if is_valid:
+            print("\n✅ Dataset is VALID")
+        else:
+            print("\n⚠️ Dataset has issues")
+        return is_valid
+
+
+def transform_stream(sources=None, sink=None, chunksize=100_000, metrics=None,
+                     rejects=None, rule_report=None, cubes=None):
+    """Clean, validate and write the sources chunk by chunk
+
+    When cubes is a list, the aggregate cube of every chunk is appended to it.
+    """
+    if sources is None:
+        sources = SOURCES
+    if sink is None:
+        sink = CsvSink(OUTPUT_PATH)
+    if metrics is None:
+        metrics = Metrics()
+    validator = StreamValidator()
+
+    for dataset_name, path in sources:
+        print(f"Streaming {dataset_name} dataset in chunks of {chunksize}...")
+        # The batch pipeline removes duplicates within each dataset
+        dedup_index = DedupIndex()
+        rows_in = 0
+        rows_out = 0
+        reader = iter(read_source(path, chunksize=chunksize))
+        while True:
+            with metrics.span('load', dataset_name) as span:
+                chunk = next(reader, None)
+                span['rows_out'] = 0 if chunk is None else len(chunk)
+                if chunk is None:
+                    span['bytes_read'] = file_size(path)
+            if chunk is None:
+                break
+            rows_in += len(chunk)
+            chunk = run_stages(chunk, dataset_name, metrics=metrics, dedup_index=dedup_index,
+                               rejects=rejects, rule_report=rule_report)
+            validator.update(chunk)
+            with metrics.span('save', rows_in=len(chunk)) as span:
+                sink.write(chunk)
+                span['rows_out'] = len(chunk)
+            if cubes is not None:
+                cubes.append(build_cube(chunk))
+            rows_out += len(chunk)
+        print(f"{dataset_name}: {rows_in} rows read, {rows_out} rows written")
+
+    with metrics.span('save') as span:
+        sink.close()
+        span['bytes_written'] = file_size(sink.output_path)
+    is_valid = validator.report()
+    return sink.rows, is_valid
+
+
+# ---------------------------------------------------------------------------
+# Parallel mode
+#
+# The per-dataset stages are independent until merge_datasets, so each
+# dataset (or hash partition of a large dataset) is transformed in its own
+# worker process. Partitioning by row hash keeps every copy of a duplicate
+# row in the same partition, so per-partition duplicate removal is still
+# exact; partitions are put back in file order before the merge.
+# ---------------------------------------------------------------------------
+
+def partition_frame(df, n_partitions):
+    """Split df into n_partitions frames by row hash, keeping the original index"""
+    buckets = DedupIndex.row_hashes(df) % np.uint64(n_partitions)
+    return [df[buckets == i] for i in range(n_partitions)]
+
+
+def transform_task(dataset_name, source, partition=0, engine='c'):
+    """Worker entry point: transform one dataset file or pre-split partition"""
+    start = time.perf_counter()
+    metrics = Metrics()
+    if isinstance(source, str):
+        with metrics.span('load', dataset_name) as span:
+            df = read_source(source, engine=engine)
+            span['rows_out'] = len(df)
+            span['bytes_read'] = file_size(source)
+        stages = TRANSFORM_STAGES
+    else:
+        # Partitions arrive already standardized and trimmed
+        df = source
+        stages = TRANSFORM_STAGES[2:]
+    rows_in = len(df)
+    rejects = []
+    rule_report = {}
+    df = run_stages(df, dataset_name, stages=stages, metrics=metrics, rejects=rejects,
+                    rule_report=rule_report)
+    timing = {
+        'dataset': dataset_name,
+        'partition': partition,
+        'pid': os.getpid(),
+        'rows_in': rows_in,
+        'rows_out': len(df),
+        'seconds': time.perf_counter() - start,
+        'spans': metrics.spans
+    }
+    return dataset_name, df, rejects, rule_report, timing
+
+
+def transform_parallel(sources=None, workers=None, partitions=1, rejects=None, rule_report=None,
+                       metrics=None, engine='c'):
+    """Transform every source in a process pool and return the cleaned frames in source order
+
+    Rows quarantined by the workers are added to rejects, their rule stats
+    to rule_report and their spans to metrics.
+    """
+    if sources is None:
+        sources = SOURCES
+    if metrics is None:
+        metrics = Metrics()
+
+    tasks = []
+    for dataset_name, path in sources:
+        if partitions > 1:
+            with metrics.span('load', dataset_name) as span:
+                df = read_source(path, engine=engine)
+                span['rows_out'] = len(df)
+                span['bytes_read'] = file_size(path)
+            df = run_stages(df, dataset_name, stages=TRANSFORM_STAGES[:2], metrics=metrics)
+            for i, part in enumerate(partition_frame(df, partitions)):
+                tasks.append((dataset_name, part, i))
+            del df
+        else:
+            tasks.append((dataset_name, path, 0, engine))
+
+    print(f"Transforming {len(tasks)} task(s) with {workers or os.cpu_count()} worker(s)...")
+    results = {dataset_name: [] for dataset_name, _ in sources}
+    timings = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(transform_task, *task) for task in tasks]
+        for future in as_completed(futures):
+            dataset_name, df, task_rejects, task_rule_report, timing = future.result()
+            results[dataset_name].append(df)
+            timings.append(timing)
+            metrics.extend(timing['spans'])
+            if rejects is not None:
+                rejects.extend(task_rejects)
+            if rule_report is not None:
+                merge_rule_report(rule_report, task_rule_report)
+    wall = time.perf_counter() - start
+
+    print(f"\n{'dataset':<12} {'part':>5} {'pid':>8} {'rows in':>9} {'rows out':>9} {'time (s)':>9}")
+    for timing in sorted(timings, key=lambda t: (t['dataset'], t['partition'])):
+        print(f"{timing['dataset']:<12} {timing['partition']:>5} {timing['pid']:>8} "
+              f"{timing['rows_in']:>9} {timing['rows_out']:>9} {timing['seconds']:>9.4f}")
+    busy = sum(t['seconds'] for t in timings)
+    print(f"Wall time: {wall:.4f}s, summed worker time: {busy:.4f}s")
+
+    frames = []
+    for dataset_name, _ in sources:
+        parts = results[dataset_name]
+        frames.append(pd.concat(parts).sort_index() if len(parts) > 1 else parts[0])
+    return frames
+
+
+def unify_categories(frames):
+    """Give shared categorical columns identical categories so concat keeps them categorical"""
+    categorical = [
+        col for col in frames[0].columns
+        if all(col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames)
+    ]
+    for col in categorical:
+        categories = pd.api.types.union_categoricals(
+            [df[col] for df in frames], ignore_order=True).categories
+        for df in frames:
+            df[col] = df[col].cat.set_categories(categories)
+    return frames
+
+
+# ---------------------------------------------------------------------------
+# Incremental mode
+#
+# The manifest records the hash of every source and of its cleaned partition
+# (data/partitions/<age_group>.csv). Only sources whose content changed are
+# re-transformed; unchanged ones reuse their partition, and the whole stage
+# is skipped when nothing changed and the merged output is intact. Load.py
+# compares the partition hashes with the ones it last loaded to upsert only
+# the changed age groups.
+# ---------------------------------------------------------------------------
+
+def partition_path(dataset_name):
+    """Cleaned partition file of one source"""
+    return os.path.join(PARTITION_DIR, f"{dataset_name.lower()}.csv")
+
+
+def transform_incremental(output_path=OUTPUT_PATH, manifest_path=MANIFEST_PATH, metrics=None,
+                          engine='c'):
+    """Re-transform only the sources whose content changed since the last run"""
+    if metrics is None:
+        metrics = Metrics()
+    os.makedirs(PARTITION_DIR, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+    state = manifest.setdefault('transform', {})
+    partitions = state.setdefault('partitions', {})
+    code_digest = file_digest(__file__)
+
+    frames = []
+    changed = []
+    changed_frames = []
+    for dataset_name, path in SOURCES:
+        part_path = partition_path(dataset_name)
+        input_digest = file_digest(path)
+        entry = partitions.get(dataset_name, {})
+        if (entry.get('input') == input_digest and entry.get('code') == code_digest
+                and entry.get('output') == file_digest(part_path)):
+            print(f"{dataset_name}: unchanged, reusing {part_path}")
+            with metrics.span('load', dataset_name) as span:
+                frames.append(pd.read_csv(part_path))
+                span['rows_out'] = len(frames[-1])
+                span['bytes_read'] = file_size(part_path)
+            continue
+
+        print(f"{dataset_name}: changed, transforming {path}")
+        rejects = []
+        with metrics.span('load', dataset_name) as span:
+            df = read_source(path, engine=engine)
+            span['rows_out'] = len(df)
+            span['bytes_read'] = file_size(path)
+        df = run_stages(df, dataset_name, metrics=metrics, rejects=rejects)
+        with metrics.span('save', dataset_name, rows_in=len(df)) as span:
+            df.to_csv(part_path, index=False)
+            span['rows_out'] = len(df)
+            span['bytes_written'] = file_size(part_path)
+        partitions[dataset_name] = {
+            'input': input_digest,
+            'code': code_digest,
+            'output': file_digest(part_path),
+            'age_group': dataset_name.lower(),
+            'rows': len(df),
+            'rejected': write_rejects(rejects, reject_path(part_path))
+        }
+        changed.append(dataset_name)
+        changed_frames.append(df)
+        frames.append(df)
+
+    cube_file = cube_path(output_path)
+    cube_current = state.get('cube') is not None and state.get('cube') == file_digest(cube_file)
+    if not changed and state.get('output') == file_digest(output_path) and cube_current:
+        print(f"\nNo source changed since the last run; {output_path} is up to date")
+        return None, changed
+
+    merged_df = merge_datasets(*frames, metrics=metrics)
+    is_valid = validate_dataset(merged_df, metrics=metrics)
+    save_dataset(merged_df, output_path, metrics=metrics)
+
+    with metrics.span('cube', rows_in=sum(len(df) for df in changed_frames)) as span:
+        if cube_current and changed:
+            # Swap the cells of the re-transformed sources for their new aggregates
+            cube = update_cube(load_cube(cube_file), pd.concat(changed_frames),
+                               replace_age_groups=[name.lower() for name in changed])
+        else:
+            span['rows_in'] = len(merged_df)
+            cube = build_cube(merged_df)
+        save_cube(cube, cube_file)
+        span['rows_out'] = len(cube)
+        span['bytes_written'] = file_size(cube_file)
+
+    state['output'] = file_digest(output_path)
+    state['cube'] = file_digest(cube_file)
+    save_manifest(manifest, manifest_path)
+    return merged_df, changed
+
+
+def merge_datasets(child_df, adolescent_df, adult_df, metrics=None):
     """Merge all three datasets"""
     print("\nMerging datasets...")
+    if metrics is None:
+        metrics = Metrics()
     
-    merged_df = pd.concat([child_df, adolescent_df, adult_df], ignore_index=True)
+    frames = [child_df, adolescent_df, adult_df]
+    with metrics.span('merge', rows_in=sum(len(df) for df in frames)) as span:
+        frames = unify_categories(frames)
+        merged_df = pd.concat(frames, ignore_index=True)
+        span['rows_out'] = len(merged_df)
     
     print(f"Datasets merged successfully")
     print(f"Total rows: {merged_df.shape[0]}")
     print(f"Total columns: {merged_df.shape[1]}")
+    print(f"Memory usage: {memory_usage_mb(merged_df):.3f} MB")
     
     return merged_df
 
 
-def validate_dataset(df):
+def validate_dataset(df, metrics=None):
     """Validate the final dataset"""
     print("\nValidating dataset...")
+    if metrics is None:
+        metrics = Metrics()
     
-    missing_total = df.isnull().sum().sum()
-    duplicates = df.duplicated().sum()
+    with metrics.span('validate', rows_in=len(df)) as span:
+        missing_total = df.isnull().sum().sum()
+        duplicates = df.duplicated().sum()
+        span['rows_out'] = len(df)
     
     # Check target variable distribution
     target_col = [col for col in df.columns if 'class' in col or 'asd' in col][0]
@@ -184,62 +939,191 @@ def validate_dataset(df):
     return is_valid
 
 
-def save_dataset(df, output_path):
-    """Save the cleaned dataset"""
+# ---------------------------------------------------------------------------
+# Columnar output
+#
+# Parquet and Arrow IPC (Feather v2) files are written with a fixed schema:
+# int8 answers/result/label, int16 age and dictionary-encoded strings. Arrow
+# IPC files are left uncompressed so readers can memory-map them.
+# ---------------------------------------------------------------------------
+
+OUTPUT_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.feather': 'arrow',
+    '.arrow': 'arrow'
+}
+
+
+def output_format(output_path):
+    """Output format implied by the file extension"""
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{ext}', expected one of {sorted(OUTPUT_FORMATS)}")
+    return OUTPUT_FORMATS[ext]
+
+
+def arrow_schema():
+    """Fixed Arrow schema of the cleaned screening dataset"""
+    import pyarrow as pa
+
+    fields = [pa.field(col, pa.int8(), nullable=False) for col in SCORE_COLUMNS]
+    fields.append(pa.field('age', pa.int16(), nullable=False))
+    for col in ['gender', 'ethnicity', 'jaundice', 'autism', 'country']:
+        fields.append(pa.field(col, pa.dictionary(pa.int16(), pa.string()), nullable=False))
+    fields.append(pa.field('result', pa.int8(), nullable=False))
+    fields.append(pa.field('relation', pa.dictionary(pa.int16(), pa.string()), nullable=False))
+    fields.append(pa.field('class_asd', pa.int8(), nullable=False))
+    fields.append(pa.field('age_group', pa.dictionary(pa.int8(), pa.string()), nullable=False))
+    return pa.schema(fields)
+
+
+def to_arrow_table(df):
+    """Convert a cleaned frame to an Arrow table with the fixed schema"""
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+
+def save_dataset(df, output_path, metrics=None):
+    """Save the cleaned dataset as CSV, Parquet or Arrow IPC depending on the extension"""
     print("\nSaving dataset...")
+    if metrics is None:
+        metrics = Metrics()
     
-    df.to_csv(output_path, index=False)
+    fmt = output_format(output_path)
+    with metrics.span('save', rows_in=len(df)) as span:
+        if fmt == 'csv':
+            df.to_csv(output_path, index=False)
+        elif fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(to_arrow_table(df), output_path, compression='zstd')
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(to_arrow_table(df), output_path, compression='uncompressed')
+        span['rows_out'] = len(df)
+        span['bytes_written'] = file_size(output_path)
     
     print(f"File saved: {output_path}")
 
 
+def read_dataset(path, memory_map=True):
+    """Read a cleaned dataset written by save_dataset back into pandas"""
+    fmt = output_format(path)
+    if fmt == 'csv':
+        return pd.read_csv(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=memory_map).to_pandas()
+    import pyarrow.feather as feather
+    return feather.read_table(path, memory_map=memory_map).to_pandas()
+
+
+def finish_metrics(metrics, path=None):
+    """Print the stage metrics and write them to path if one was given"""
+    metrics.print_report()
+    if path:
+        metrics.write(path)
+
+
 def main():
     """Main transformation pipeline"""
+    parser = argparse.ArgumentParser(description='Autism Screening transformation pipeline')
+    parser.add_argument('--mode', choices=['batch', 'stream', 'parallel', 'incremental'], default='batch',
+                        help='batch loads each dataset whole; stream processes fixed-size chunks; '
+                             'parallel transforms datasets in a process pool; incremental only '
+                             're-transforms sources that changed since the last run')
+    parser.add_argument('--engine', choices=READ_ENGINES, default='c',
+                        help='CSV reader: pandas C parser, pyarrow, or the C parser over byte ranges '
+                             'in a thread pool (stream mode always reads chunks with the C parser)')
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help='rows per chunk in stream mode')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes in parallel mode (default: CPU count)')
+    parser.add_argument('--partitions', type=int, default=1,
+                        help='hash partitions per dataset in parallel mode')
+    parser.add_argument('--output', default=OUTPUT_PATH,
+                        help='cleaned dataset path; .parquet, .feather or .arrow write columnar output')
+    parser.add_argument('--metrics', default=None, metavar='PATH',
+                        help='write the stage metrics as JSON, or Prometheus text format for .prom / .txt')
+    args = parser.parse_args()
+
     print("\nAUTISM SCREENING DATA - TRANSFORMATION PIPELINE\n")
+
+    metrics = Metrics()
+    rejects = []
+    rule_report = {}
+    if args.mode == 'stream':
+        cubes = []
+        rows, is_valid = transform_stream(sink=make_sink(args.output), chunksize=args.chunksize,
+                                          rejects=rejects, rule_report=rule_report, cubes=cubes,
+                                          metrics=metrics)
+        print_rule_report(rule_report)
+        write_rejects(rejects, reject_path(args.output))
+        print(f"\nFile saved: {args.output}")
+        with metrics.span('cube', rows_in=rows) as span:
+            cube = merge_cubes(*cubes)
+            save_cube(cube, cube_path(args.output))
+            span['rows_out'] = len(cube)
+            span['bytes_written'] = file_size(cube_path(args.output))
+        finish_metrics(metrics, args.metrics)
+        print("\n✅ Transformation completed successfully")
+        print(f"Final dataset: {rows} rows")
+        print(f"Output file: {args.output}\n")
+        return
+
+    if args.mode == 'incremental':
+        merged_df, changed = transform_incremental(output_path=args.output, metrics=metrics,
+                                                  engine=args.engine)
+        finish_metrics(metrics, args.metrics)
+        if merged_df is not None:
+            print(f"\n✅ Transformation completed successfully ({len(changed)} source(s) re-transformed)")
+            print(f"Final dataset: {merged_df.shape[0]} rows, {merged_df.shape[1]} columns")
+            print(f"Output file: {args.output}\n")
+        return
     
-    # 1. Load data
-    child_df, adolescent_df, adult_df = load_data()
-    
-    # 2. Standardize column names
-    print("\nStandardizing columns...")
-    child_df = standardize_columns(child_df)
-    adolescent_df = standardize_columns(adolescent_df)
-    adult_df = standardize_columns(adult_df)
-    print("Column names standardized")
-    
-    # 3. Drop unnecessary columns
-    columns_to_drop = ['unnamed:_0', 'used_app_before', 'age_desc']
-    child_df = drop_unnecessary_columns(child_df, columns_to_drop)
-    adolescent_df = drop_unnecessary_columns(adolescent_df, columns_to_drop)
-    adult_df = drop_unnecessary_columns(adult_df, columns_to_drop)
-    print("Unnecessary columns dropped")
-    
-    # 4. Clean datasets
-    child_clean = clean_dataset(child_df, 'Child')
-    adolescent_clean = clean_dataset(adolescent_df, 'Adolescent')
-    adult_clean = clean_dataset(adult_df, 'Adult')
-    
-    # 5. Handle missing values
-    child_clean = handle_missing_values(child_clean, 'Child')
-    adolescent_clean = handle_missing_values(adolescent_clean, 'Adolescent')
-    adult_clean = handle_missing_values(adult_clean, 'Adult')
-    
-    # 6. Convert data types
-    child_clean = convert_data_types(child_clean, 'Child')
-    adolescent_clean = convert_data_types(adolescent_clean, 'Adolescent')
-    adult_clean = convert_data_types(adult_clean, 'Adult')
+    if args.mode == 'parallel':
+        # 1-6. Load and transform each dataset in a worker process
+        child_clean, adolescent_clean, adult_clean = transform_parallel(
+            workers=args.workers, partitions=args.partitions, rejects=rejects, rule_report=rule_report,
+            metrics=metrics, engine=args.engine)
+    else:
+        # 1. Load data
+        child_df, adolescent_df, adult_df = load_data(metrics=metrics, engine=args.engine)
+
+        # 2-6. Standardize, drop columns, clean, handle missing values and
+        # convert types in a single pass per dataset
+        ctx = {'metrics': metrics, 'rejects': rejects, 'rule_report': rule_report}
+        child_clean = run_stages(child_df, 'Child', **ctx)
+        adolescent_clean = run_stages(adolescent_df, 'Adolescent', **ctx)
+        adult_clean = run_stages(adult_df, 'Adult', **ctx)
+        del child_df, adolescent_df, adult_df
+    
+    # Rows breaking a table constraint never reach the cleaned output
+    print_rule_report(rule_report)
+    write_rejects(rejects, reject_path(args.output))
     
     # 7. Merge datasets
-    merged_df = merge_datasets(child_clean, adolescent_clean, adult_clean)
+    merged_df = merge_datasets(child_clean, adolescent_clean, adult_clean, metrics=metrics)
+    del child_clean, adolescent_clean, adult_clean
     
     # 8. Validate dataset
-    is_valid = validate_dataset(merged_df)
+    is_valid = validate_dataset(merged_df, metrics=metrics)
     
     # 9. Save cleaned dataset
-    output_path = 'data/Autism_test_clean.csv'
-    save_dataset(merged_df, output_path)
+    output_path = args.output
+    save_dataset(merged_df, output_path, metrics=metrics)
+    
+    # 10. Aggregate cube for group-by queries
+    with metrics.span('cube', rows_in=len(merged_df)) as span:
+        cube = build_cube(merged_df)
+        save_cube(cube, cube_path(output_path))
+        span['rows_out'] = len(cube)
+        span['bytes_written'] = file_size(cube_path(output_path))
+    finish_metrics(metrics, args.metrics)
     
-    # 10. Final summary
+    # 11. Final summary
     print("\n✅ Transformation completed successfully")
     print(f"Final dataset: {merged_df.shape[0]} rows, {merged_df.shape[1]} columns")
     print(f"Output file: {output_path}\n")
@@ -27,7 +27,7 @@ echo.
 echo ========================================
 echo STEP 2: TRANSFORM
 echo ========================================
-python Code\Transform.py
+python Code\Transform.py --mode incremental
 if errorlevel 1 (
     echo.
     echo X Transform failed!
@@ -39,7 +39,7 @@ echo.
 echo ========================================
 echo STEP 3: LOAD
 echo ========================================
-python Code\Load.py
+python Code\Load.py --incremental --swap
 if errorlevel 1 (
     echo.
     echo X Load failed!
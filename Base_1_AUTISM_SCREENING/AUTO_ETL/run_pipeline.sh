@@ -27,7 +27,7 @@ echo ""
 echo "========================================"
 echo "STEP 2: TRANSFORM"
 echo "========================================"
-python Code/Transform.py
+python Code/Transform.py --mode incremental
 if [ $? -ne 0 ]; then
     echo ""
     echo "X Transform failed!"
@@ -38,7 +38,7 @@ echo ""
 echo "========================================"
 echo "STEP 3: LOAD"
 echo "========================================"
-python Code/Load.py
+python Code/Load.py --incremental --swap
 if [ $? -ne 0 ]; then
     echo ""
     echo "X Load failed!"
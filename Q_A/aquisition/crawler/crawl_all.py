@@ -0,0 +1,32 @@
+"""
+Run every spider of the project side by side in one process
+
+Politeness is per host (DOWNLOAD_SLOTS in crawler/settings.py), so the sites
+are crawled concurrently instead of one spider after the other. Extra
+arguments are Scrapy settings, e.g.:
+
+    python crawl_all.py FIXTURE_SERVER_URL=http://127.0.0.1:8765
+"""
+
+import sys
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+SPIDERS = ["childmind_guide", "autismhub", "medscape"]
+
+
+def main():
+    settings = get_project_settings()
+    for arg in sys.argv[1:]:
+        name, value = arg.split("=", 1)
+        settings.set(name, value, priority="cmdline")
+
+    process = CrawlerProcess(settings)
+    for spider in SPIDERS:
+        process.crawl(spider)
+    process.start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# Fetch engine extensions: per-host AutoThrottle and the HTTP cache policy
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/autothrottle.html
+# https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware
+
+from scrapy.extensions.httpcache import RFC2616Policy
+from scrapy.extensions.throttle import AutoThrottle
+
+
+class HostAutoThrottle(AutoThrottle):
+    """AutoThrottle whose minimum delay is the DOWNLOAD_SLOTS delay of each host
+
+    The stock extension clamps every slot to the global DOWNLOAD_DELAY, which
+    would let it shorten the delay a host asks for in its robots.txt.
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        self.default_min_delay = crawler.settings.getfloat("DOWNLOAD_DELAY")
+        self.min_delays = {
+            host: float(profile["delay"])
+            for host, profile in crawler.settings.getdict("DOWNLOAD_SLOTS").items()
+            if "delay" in profile
+        }
+
+    def _response_downloaded(self, response, request, spider):
+        self.mindelay = self.min_delays.get(request.meta.get("download_slot"), self.default_min_delay)
+        super()._response_downloaded(response, request, spider)
+
+
+class RevalidatingCachePolicy(RFC2616Policy):
+    """RFC 2616 policy that never serves a cached page without asking the server
+
+    Every cached response is revalidated with its ETag / Last-Modified, so an
+    unchanged page costs one 304 and a changed one is downloaded and stored.
+    """
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        self._set_conditional_validators(request, cachedresponse)
+        return False
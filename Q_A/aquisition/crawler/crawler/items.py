@@ -3,10 +3,26 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+import hashlib
+from datetime import datetime, timezone
+
 import scrapy
 
 
-class CrawlerItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+class PageItem(scrapy.Item):
+    # One fetched page, stored by RawStorePipeline
+    url = scrapy.Field()
+    fetched_at = scrapy.Field()  # ISO 8601, UTC
+    sha256 = scrapy.Field()      # hex digest of body
+    body = scrapy.Field()
+    filename = scrapy.Field()    # path under RAW_DIR read by the extract step
+
+    @classmethod
+    def from_response(cls, response, filename):
+        return cls(
+            url=response.url,
+            fetched_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            sha256=hashlib.sha256(response.body).hexdigest(),
+            body=response.body,
+            filename=filename,
+        )
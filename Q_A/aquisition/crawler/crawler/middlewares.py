@@ -3,7 +3,10 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+from urllib.parse import urlsplit
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -98,3 +101,50 @@ class CrawlerDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class FixtureServerMiddleware:
+    """Send every request to a local fixture server instead of the real site
+
+    Enabled by the FIXTURE_SERVER_URL setting. https://host/path is fetched as
+    FIXTURE_SERVER_URL/host/path, and the response is handed back under the
+    original URL. The request keeps the download slot of the real host, so
+    per-host throttling and the HTTP cache behave as in a real crawl.
+    """
+
+    def __init__(self, fixture_url):
+        self.fixture_url = fixture_url.rstrip("/")
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        fixture_url = crawler.settings.get("FIXTURE_SERVER_URL")
+        if not fixture_url:
+            raise NotConfigured
+        return cls(fixture_url)
+
+    def process_request(self, request, spider):
+        if "fixture_original_url" in request.meta:
+            return None
+        parts = urlsplit(request.url)
+        request.meta["fixture_original_url"] = request.url
+        request.meta.setdefault("download_slot", parts.hostname)
+        fixture_url = f"{self.fixture_url}/{parts.netloc}{parts.path or '/'}"
+        if parts.query:
+            fixture_url += f"?{parts.query}"
+        request._set_url(fixture_url)
+        return None
+
+    def _restore_url(self, request):
+        original_url = request.meta.pop("fixture_original_url", None)
+        if original_url:
+            request._set_url(original_url)
+        return original_url
+
+    def process_response(self, request, response, spider):
+        original_url = self._restore_url(request)
+        if original_url:
+            return response.replace(url=original_url)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self._restore_url(request)
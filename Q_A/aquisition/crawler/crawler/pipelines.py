@@ -3,11 +3,98 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import gzip
+import json
+import os
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from twisted.internet.threads import deferToThread
 
 
-class CrawlerPipeline:
+class RawStorePipeline:
+    """Write fetched pages to a gzip, content-addressed raw store
+
+    Bodies are stored once as RAW_STORE_DIR/objects/<sha[:2]>/<sha>.html.gz,
+    so an unchanged page is never written twice. The named file the extract
+    step reads (RAW_DIR/<filename>) is rewritten only when its content
+    changed. RAW_STORE_DIR/<spider>.json maps every URL to its latest hash,
+    fetch time and file. Disk writes run in the reactor's thread pool, away
+    from the download loop.
+    """
+
+    def __init__(self, raw_dir, store_dir, stats):
+        self.raw_dir = raw_dir
+        self.store_dir = store_dir
+        self.stats = stats
+        self.index = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        raw_dir = crawler.settings.get("RAW_DIR")
+        store_dir = crawler.settings.get("RAW_STORE_DIR") or os.path.join(raw_dir, "store")
+        return cls(raw_dir, store_dir, crawler.stats)
+
+    def index_path(self, spider):
+        return os.path.join(self.store_dir, f"{spider.name}.json")
+
+    def object_path(self, sha256):
+        return os.path.join(self.store_dir, "objects", sha256[:2], f"{sha256}.html.gz")
+
+    def open_spider(self, spider):
+        os.makedirs(self.store_dir, exist_ok=True)
+        if os.path.exists(self.index_path(spider)):
+            with open(self.index_path(spider), encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def close_spider(self, spider):
+        with open(self.index_path(spider), "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+
     def process_item(self, item, spider):
-        return item
+        adapter = ItemAdapter(item)
+        previous = self.index.get(adapter["url"], {})
+        unchanged = (previous.get("sha256") == adapter["sha256"]
+                     and previous.get("filename") == adapter["filename"])
+        d = deferToThread(self.write, adapter["sha256"], adapter["body"], adapter["filename"], unchanged)
+        d.addCallback(self.written, adapter)
+        return d
+
+    def write(self, sha256, body, filename, unchanged):
+        """Store the body and the named file if needed; runs in a worker thread"""
+        stored = False
+        object_path = self.object_path(sha256)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            atomic_write(object_path, gzip.compress(body, mtime=0))
+            stored = True
+
+        file_path = os.path.join(self.raw_dir, filename)
+        file_written = False
+        if not (unchanged and os.path.exists(file_path)):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            atomic_write(file_path, body)
+            file_written = True
+        return stored, file_written
+
+    def written(self, result, adapter):
+        stored, file_written = result
+        self.stats.inc_value("raw_store/stored" if stored else "raw_store/deduplicated")
+        if file_written:
+            self.stats.inc_value("raw_store/files_written")
+        self.index[adapter["url"]] = {
+            "sha256": adapter["sha256"],
+            "fetched_at": adapter["fetched_at"],
+            "filename": adapter["filename"],
+        }
+        # The body lives in the store now; keep it out of feeds and memory
+        adapter["body"] = None
+        return adapter.item
+
+
+def atomic_write(path, data):
+    """Write data to path through a temporary file, so readers never see a partial file"""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -21,8 +21,18 @@ ADDONS = {}
 # Obey robots.txt rules
 ROBOTSTXT_OBEY = True
 
-DOWNLOAD_DELAY = 2 
-CONCURRENT_REQUESTS = 1 
+# Politeness is enforced per host (download slot), not globally: the spiders
+# can run side by side in one process (crawl_all.py) while each site sees at
+# most its own concurrency, spaced by at least its own delay
+CONCURRENT_REQUESTS = 8
+CONCURRENT_REQUESTS_PER_DOMAIN = 1
+DOWNLOAD_DELAY = 2
+
+DOWNLOAD_SLOTS = {
+    "childmind.org": {"concurrency": 1, "delay": 10},   # robots.txt
+    "autismhub.ie": {"concurrency": 1, "delay": 2},
+    "emedicine.medscape.com": {"concurrency": 2, "delay": 2},
+}
 
 USER_AGENT = "Mozilla/5.0 (compatible; ResearchBot/1.0; +https://example.com/bot-info)"
 
@@ -46,42 +56,54 @@ USER_AGENT = "Mozilla/5.0 (compatible; ResearchBot/1.0; +https://example.com/bot
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "crawler.middlewares.CrawlerDownloaderMiddleware": 543,
-#}
+# Runs after the HTTP cache so cache keys and download slots keep the real URL
+DOWNLOADER_MIDDLEWARES = {
+    "crawler.middlewares.FixtureServerMiddleware": 950,
+}
+
+# Base URL of a local fixture server (fixture_server.py) standing in for the
+# real sites, e.g. scrapy crawl medscape -s FIXTURE_SERVER_URL=http://127.0.0.1:8765
+FIXTURE_SERVER_URL = ""
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "scrapy.extensions.throttle.AutoThrottle": None,
+    "crawler.extensions.HostAutoThrottle": 0,
+}
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "crawler.pipelines.CrawlerPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "crawler.pipelines.RawStorePipeline": 300,
+}
+
+# Named raw files read by the extract step, relative to aquisition/crawler,
+# and the content-addressed store (default: RAW_DIR/store)
+RAW_DIR = "../../data/raw"
+RAW_STORE_DIR = ""
 
-# Enable and configure the AutoThrottle extension (disabled by default)
+# AutoThrottle, with the delay of each host kept at or above its
+# DOWNLOAD_SLOTS delay (HostAutoThrottle replaces the stock extension)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-#AUTOTHROTTLE_ENABLED = True
-# The initial download delay
-#AUTOTHROTTLE_START_DELAY = 5
-# The maximum download delay to be set in case of high latencies
-#AUTOTHROTTLE_MAX_DELAY = 60
-# The average number of requests Scrapy should be sending in parallel to
-# each remote server
-#AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
-# Enable showing throttling stats for every response received:
+AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_START_DELAY = 2
+AUTOTHROTTLE_MAX_DELAY = 60
+AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
 #AUTOTHROTTLE_DEBUG = False
 
-# Enable and configure HTTP caching (disabled by default)
+# Persistent HTTP cache (.scrapy/httpcache). Every cached page is revalidated
+# with If-None-Match / If-Modified-Since, so re-crawling an unchanged page
+# costs one 304 and the stored body is reused.
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_ENABLED = True
+HTTPCACHE_POLICY = "crawler.extensions.RevalidatingCachePolicy"
+HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_EXPIRATION_SECS = 0
+HTTPCACHE_ALWAYS_STORE = True
+HTTPCACHE_GZIP = True
+HTTPCACHE_IGNORE_HTTP_CODES = [500, 502, 503, 504]
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
@@ -1,23 +1,16 @@
-import os
 import scrapy
 
+from crawler.items import PageItem
+
 class ChildmindGuideSpider(scrapy.Spider):
     name = "childmind_guide"
-    destination_folder = f"../../data/raw/{name}"
-    os.makedirs(destination_folder, exist_ok=True)
     allowed_domains = ["childmind.org"]
     start_urls = [
         "https://childmind.org/guide/parents-guide-to-autism/"
     ]
 
-    custom_settings = {
-        "DOWNLOAD_DELAY": 10,   # robots.txt
-        "CONCURRENT_REQUESTS": 1,
-    }
-    
-    def parse(self, response):
-        # Save full HTML
-        with open(f"{self.destination_folder}/child_mind.html", "wb") as f:
-            f.write(response.body)
+    # Crawl delay and concurrency: DOWNLOAD_SLOTS["childmind.org"] in settings.py
 
-        self.log("HTML saved successfully")
+    def parse(self, response):
+        # Full HTML, written by RawStorePipeline
+        yield PageItem.from_response(response, f"{self.name}/child_mind.html")
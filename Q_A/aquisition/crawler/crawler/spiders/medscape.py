@@ -1,11 +1,10 @@
-import os
 import scrapy
 from urllib.parse import urljoin
 
+from crawler.items import PageItem
+
 class MedscapeSpider(scrapy.Spider):
     name = "medscape"
-    destination_folder = f"../../data/raw/{name}"
-    os.makedirs(destination_folder, exist_ok=True)
     allowed_domains = ["emedicine.medscape.com"]
     start_urls = [
         "https://emedicine.medscape.com/article/912781-overview"
@@ -19,13 +18,9 @@ class MedscapeSpider(scrapy.Spider):
             return
         self.visited.add(response.url)
 
-        # Save or extract content
+        # Raw HTML, written by RawStorePipeline
         page_id = response.url.split("/")[-1]
-        filename = f"{self.destination_folder}/medscape_{page_id}.html"
-        with open(filename, "wb") as f:
-            f.write(response.body)
-
-        self.log(f"Saved {filename}")
+        yield PageItem.from_response(response, f"{self.name}/medscape_{page_id}.html")
 
         # Find "Next" links
         next_links = response.css(
@@ -0,0 +1,105 @@
+"""
+Local fixture server standing in for the crawled sites
+
+Serves FIXTURE_DIR/<host>/<path> for http://127.0.0.1:<port>/<host>/<path>
+(index.html for paths ending in '/'), with ETag and Last-Modified headers,
+Cache-Control: no-cache and 304 answers to conditional requests, like the
+real sites. Point the spiders at it with the FIXTURE_SERVER_URL setting:
+
+    python fixture_server.py --port 8765
+    scrapy crawl medscape -s FIXTURE_SERVER_URL=http://127.0.0.1:8765
+
+Ctrl+C prints how many 200 / 304 / 404 answers were sent.
+"""
+
+import argparse
+import collections
+import email.utils
+import hashlib
+import http.server
+import os
+import threading
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    fixture_dir = FIXTURE_DIR
+    counts = collections.Counter()
+    lock = threading.Lock()
+
+    def fixture_path(self):
+        path = self.path.split("?", 1)[0].lstrip("/")
+        if not path or path.endswith("/"):
+            path += "index.html"
+        full_path = os.path.normpath(os.path.join(self.fixture_dir, path))
+        if not full_path.startswith(os.path.normpath(self.fixture_dir) + os.sep):
+            return None
+        if os.path.isdir(full_path):
+            full_path = os.path.join(full_path, "index.html")
+        return full_path if os.path.isfile(full_path) else None
+
+    def send(self, status, body=b"", headers=None):
+        with self.lock:
+            self.counts[status] += 1
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.fixture_path()
+        if path is None:
+            self.send(404, b"Not found", {"Content-Type": "text/plain"})
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": email.utils.formatdate(os.path.getmtime(path), usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        if self.headers.get("If-None-Match") == etag:
+            self.send(304, headers=headers)
+            return
+        content_type = "text/plain" if path.endswith(".txt") else "text/html; charset=utf-8"
+        self.send(200, body, dict(headers, **{"Content-Type": content_type}))
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}")
+
+
+def make_server(port=0, fixture_dir=FIXTURE_DIR):
+    """Fixture server bound to 127.0.0.1; port 0 picks a free port"""
+    handler = type("Handler", (FixtureHandler,), {"fixture_dir": fixture_dir,
+                                                   "counts": collections.Counter()})
+    return http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fixture server for the spiders")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="directory of <host>/<path> files")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.fixtures)
+    print(f"Serving {args.fixtures} on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        counts = server.RequestHandlerClass.counts
+        print("Responses: " + ", ".join(f"{status}: {n}" for status, n in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""
+Benchmark of the HTML extraction: previous BeautifulSoup code vs html_engine
+
+Builds large synthetic pages with the structure of each source (target
+sections between navigation and filler markup), extracts them with the
+previous full-tree BeautifulSoup implementation and with the streaming lxml
+engine, checks that both return the same rows and prints time, throughput
+and peak RSS.
+
+    python extract/benchmark_extract.py --sections 1000 10000
+
+The medscape-pages benchmark times medscape.extract_pages over many pages:
+sequential without cache, then with the process pool and page cache cold,
+warm and after a partial re-crawl.
+
+    python extract/benchmark_extract.py medscape-pages --pages 200 --sections 100
+
+The walker micro-benchmark times the H2/H3 section walk alone on parsed
+Medscape-style documents: the previous double walk over the children vs
+html_engine.walk_sections.
+
+    python extract/benchmark_extract.py walker --sections 100 1000 --subsections 20
+
+The resolver benchmark resolves slightly altered section titles (case,
+plurals, typos) and titles that are not indexed, with section_index and
+with a scan scoring every question against every title.
+
+    python extract/benchmark_extract.py resolver --sections 500 2000
+"""
+
+import argparse
+import gc
+import glob
+import os
+import random
+import tempfile
+import time
+
+from bs4 import BeautifulSoup, Tag
+import lxml.html
+
+import ask_autism
+import childmind
+import html_engine
+import medscape
+import section_index
+
+WORDS = ("autism spectrum disorder children diagnosis social communication behavior "
+         "therapy parents school support development screening clinician early").split()
+
+
+# ---------------------------------------------------------------------------
+# Previous implementations (full BeautifulSoup tree)
+# ---------------------------------------------------------------------------
+
+def ask_autism_bs4(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        soup = BeautifulSoup(file.read(), 'html.parser')
+    rows = []
+    for section in soup.find_all('section', class_='av_toggle_section'):
+        question = section.find('p', class_='toggler').text.strip()
+        answer = ' '.join([p.text.strip() for p in section.find_all('p')])
+        answer = answer.split("Answer:")[1]
+        answer = answer.split("References:")[0]
+        rows.append([question.replace(';', '').replace('\n', ''), answer.replace(';', '').replace('\n', '')])
+    return rows
+
+
+def childmind_bs4(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        soup = BeautifulSoup(file.read(), 'html.parser')
+    rows = []
+    for section in soup.find_all('section', class_='guide-wrapper-block'):
+        question = section.find('div', class_='flex-grow').text.strip()
+        answer = ' '.join([p.text.strip() for p in section.find('div', class_='pl-10').find_all('p')])
+        rows.append([question.replace(';', '').replace('\n', ''), answer.replace(';', '').replace('\n', '')])
+    return rows
+
+
+def medscape_bs4(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        soup = BeautifulSoup(file.read(), 'lxml')
+
+    def clean_text(tag):
+        return " ".join(tag.stripped_strings)
+
+    sections = {}
+    for container in soup.select('div[id^="content_"]'):
+        h2 = container.find("h2", recursive=False)
+        content = container.find("div", class_="refsection_content")
+        if not h2 or not content:
+            continue
+        children = [child for child in content.children if isinstance(child, Tag)]
+        buffer = []
+        for child in children:
+            if child.name == "h3":
+                break
+            if child.name in ("p", "ul", "ol"):
+                buffer.append(clean_text(child))
+        sections[clean_text(h2)] = {"type": "h2", "content": "\n".join(buffer).strip()}
+
+        current_h3 = None
+        buffer = []
+        for child in children:
+            if child.name == "h3":
+                if current_h3:
+                    sections[current_h3] = {"type": "h3", "content": "\n".join(buffer).strip()}
+                current_h3 = clean_text(child)
+                buffer = []
+                continue
+            if current_h3 and child.name in ("p", "ul", "ol"):
+                buffer.append(clean_text(child))
+        if current_h3:
+            sections[current_h3] = {"type": "h3", "content": "\n".join(buffer).strip()}
+    return sections
+
+
+def clean_text_walk(element):
+    """Previous html_engine.clean_text: Python walk over every text node"""
+    return " ".join(text.strip() for text in html_engine.iter_strings(element) if text.strip())
+
+
+def medscape_double_walk(contents):
+    """Previous section walk: one pass for the H2 preamble, one for the H3 subsections"""
+    sections = {}
+    for h2_text, content in contents:
+        children = html_engine.child_elements(content)
+        buffer = []
+        for child in children:
+            if child.tag == "h3":
+                break
+            if child.tag in ("p", "ul", "ol"):
+                buffer.append(clean_text_walk(child))
+        sections[h2_text] = {"type": "h2", "content": "\n".join(buffer).strip()}
+
+        current_h3 = None
+        buffer = []
+        for child in children:
+            if child.tag == "h3":
+                if current_h3:
+                    sections[current_h3] = {"type": "h3", "content": "\n".join(buffer).strip()}
+                current_h3 = clean_text_walk(child)
+                buffer = []
+                continue
+            if current_h3 and child.tag in ("p", "ul", "ol"):
+                buffer.append(clean_text_walk(child))
+        if current_h3:
+            sections[current_h3] = {"type": "h3", "content": "\n".join(buffer).strip()}
+    return sections
+
+
+def medscape_single_walk(contents):
+    """The walk of medscape.extract_medscape_sections"""
+    sections = {}
+    for h2_text, content in contents:
+        for heading, texts in html_engine.walk_sections(html_engine.child_elements(content)):
+            if heading is None:
+                sections[h2_text] = {"type": "h2", "content": "\n".join(texts).strip()}
+            elif heading:
+                sections[heading] = {"type": "h3", "content": "\n".join(texts).strip()}
+    return sections
+
+
+# ---------------------------------------------------------------------------
+# Synthetic pages
+# ---------------------------------------------------------------------------
+
+def sentence(rng, n_words=14):
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def filler(rng):
+    """Navigation and layout markup found between the sections of the real pages"""
+    links = "".join(f'<li><a href="/page-{rng.randrange(1000)}">{rng.choice(WORDS)}</a></li>'
+                    for _ in range(8))
+    return (f'<nav class="menu"><ul>{links}</ul></nav>'
+            f'<div class="banner"><span>{sentence(rng, 6)}</span><!-- ad slot --></div>'
+            f'<script>window.dataLayer = window.dataLayer || [];</script>')
+
+
+def page(body):
+    return f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8"><title>Benchmark</title></head>' \
+           f'<body>{body}</body></html>'
+
+
+def ask_autism_page(n_sections, rng):
+    parts = []
+    for i in range(n_sections):
+        parts.append(filler(rng))
+        parts.append(
+            f'<section class="av_toggle_section"><p class="toggler">Question {i}: {sentence(rng, 8)}?</p>'
+            f'<div class="toggle_content"><p>Answer: {sentence(rng)}</p><p>{sentence(rng)} '
+            f'<strong>{sentence(rng, 4)}</strong>&nbsp;{sentence(rng, 5)}</p>'
+            f'<p>References: {sentence(rng, 5)}</p></div></section>')
+    return page("".join(parts))
+
+
+def childmind_page(n_sections, rng):
+    parts = []
+    for i in range(n_sections):
+        parts.append(filler(rng))
+        paragraphs = "".join(f'<p>{sentence(rng)} <a href="#">{sentence(rng, 3)}</a></p>' for _ in range(3))
+        parts.append(
+            f'<section class="guide-wrapper-block"><div class="flex items-center">'
+            f'<div class="flex-grow">Question {i}; {sentence(rng, 8)}?</div></div>'
+            f'<div class="pl-10">{paragraphs}</div></section>')
+    return page("".join(parts))
+
+
+def medscape_page(n_sections, rng, prefix='', n_subsections=3):
+    parts = []
+    for i in range(n_sections):
+        parts.append(filler(rng))
+        subsections = "".join(
+            f'<h3>Subsection {prefix}{i}.{j}</h3><p>{sentence(rng)}</p>'
+            f'<ul><li>{sentence(rng, 6)}</li><li>{sentence(rng, 6)}</li></ul>'
+            for j in range(n_subsections))
+        parts.append(
+            f'<div id="content_{i}"><h2>Section {prefix}{i}</h2><div class="refsection_content">'
+            f'<p>{sentence(rng)}</p><ol><li>{sentence(rng, 5)}</li></ol>{subsections}'
+            f'<!-- end of section --></div></div>')
+    return page("".join(parts))
+
+
+def vocabulary(rng, n_words=3_000):
+    """Made-up words alternating consonants and vowels, reused across titles like real headings"""
+    consonants, vowels = "bcdfghjklmnpqrstvwxz", "aeiouy"
+    return [''.join(rng.choice(vowels if i % 2 else consonants) for i in range(rng.randint(4, 10)))
+            for _ in range(n_words)]
+
+
+def section_title(rng, vocab):
+    words = [rng.choice(WORDS) if rng.random() < 0.2 else rng.choice(vocab)
+             for _ in range(rng.randint(2, 4))]
+    return " ".join(words).capitalize()
+
+
+def altered_title(title, rng):
+    """A heading as it may drift on the site: case, plural, typo or extra word"""
+    change = rng.randrange(4)
+    if change == 0:
+        return title.lower()
+    if change == 1:
+        return title + "s"
+    if change == 2:
+        i = rng.randrange(1, len(title))
+        return title[:i - 1] + title[i:]
+    return title + " " + rng.choice(WORDS)
+
+
+SOURCES = [
+    ('ask_autism', ask_autism_page, ask_autism_bs4, ask_autism.extract_rows),
+    ('childmind', childmind_page, childmind_bs4, childmind.extract_rows),
+    ('medscape', medscape_page, medscape_bs4, medscape.extract_medscape_sections),
+]
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def reset_peak_rss():
+    """Reset the kernel's RSS high-water mark (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    """VmHWM of this process in MB, None where /proc is unavailable"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def measure(func, path):
+    gc.collect()
+    reset_peak_rss()
+    start = time.perf_counter()
+    result = func(path)
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss_mb(), result
+
+
+def bench_parse(sizes, seed=0):
+    """Previous BeautifulSoup extraction vs the engine on one large page per source"""
+    print(f"\n{'source':<12} {'sections':>9} {'size (MB)':>10} {'engine':<14} {'time (s)':>9} "
+          f"{'MB/s':>7} {'peak RSS (MB)':>14}")
+    for n_sections in sizes:
+        for name, make_page, previous, engine in SOURCES:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, f'{name}.html')
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(make_page(n_sections, random.Random(seed)))
+                size_mb = os.path.getsize(path) / (1024 * 1024)
+
+                results = []
+                for label, func in [('bs4 (previous)', previous), ('lxml iterparse', engine)]:
+                    elapsed, peak, result = measure(func, path)
+                    results.append(result)
+                    rss = f"{peak:.1f}" if peak is not None else 'n/a'
+                    print(f"{name:<12} {n_sections:>9,} {size_mb:>10.2f} {label:<14} {elapsed:>9.3f} "
+                          f"{size_mb / elapsed:>7.1f} {rss:>14}")
+                    del result
+                if results[0] != results[1]:
+                    print(f"✗ {name}: the engine's rows differ from the previous implementation")
+                del results
+
+
+def write_medscape_pages(directory, n_pages, n_sections, seed=0, pages=None):
+    """Write synthetic Medscape pages; pages limits the rewrite to those indices"""
+    for i in pages if pages is not None else range(n_pages):
+        path = os.path.join(directory, f'medscape_912781-page{i:04d}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(medscape_page(n_sections, random.Random(seed * 100_003 + i), prefix=f'{i}-'))
+
+
+def bench_medscape_pages(n_pages, n_sections, workers=None, changed_share=0.1, seed=0):
+    """Cold, warm and partial re-crawl runs of medscape.extract_pages"""
+    print(f"\nMedscape extraction: {n_pages} pages of {n_sections} sections, "
+          f"{workers or os.cpu_count()} worker(s)\n")
+    print(f"{'run':<24} {'parsed':>7} {'cached':>7} {'time (s)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = os.path.join(tmp, 'raw')
+        cache_dir = os.path.join(tmp, 'cache')
+        os.makedirs(raw_dir)
+        write_medscape_pages(raw_dir, n_pages, n_sections, seed)
+        files = sorted(glob.glob(os.path.join(raw_dir, 'medscape_912781-*.html')))
+
+        changed = random.Random(seed).sample(range(n_pages), max(1, round(n_pages * changed_share)))
+        runs = [
+            ('sequential, no cache', dict(workers=1, cache_dir=None)),
+            ('cold cache', dict(workers=workers, cache_dir=cache_dir)),
+            ('warm cache', dict(workers=workers, cache_dir=cache_dir)),
+            (f'{len(changed)} page(s) re-crawled', dict(workers=workers, cache_dir=cache_dir)),
+        ]
+        reference = None
+        for label, kwargs in runs:
+            if label.endswith('re-crawled'):
+                write_medscape_pages(raw_dir, n_pages, n_sections, seed + 1, pages=changed)
+            start = time.perf_counter()
+            sections, (parsed, cached) = medscape.extract_pages(files, **kwargs)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<24} {parsed:>7} {cached:>7} {elapsed:>9.3f}")
+            if reference is None:
+                reference = sections
+            elif not label.endswith('re-crawled') and sections != reference:
+                print(f"✗ {label}: sections differ from the sequential run")
+
+
+def bench_walker(sizes, n_subsections=20, seed=0, repeat=3):
+    """Section walk alone on parsed documents: double walk vs walk_sections"""
+    print(f"\nMedscape section walk, {n_subsections} H3 subsections per H2 section\n")
+    print(f"{'sections':>9} {'nodes':>9} {'walk':<14} {'time (s)':>9} {'sections/s':>12}")
+    for n_sections in sizes:
+        root = lxml.html.fromstring(medscape_page(n_sections, random.Random(seed),
+                                                  n_subsections=n_subsections))
+        contents = []
+        for container in root.iter('div'):
+            if html_engine.id_startswith('content_')(container):
+                h2 = container.find('h2')
+                content = html_engine.find(container, 'div', html_engine.has_class('refsection_content'))
+                contents.append((html_engine.clean_text(h2), content))
+        n_nodes = sum(1 for _ in root.iter())
+
+        results = []
+        for label, walk in [('double walk', medscape_double_walk), ('single pass', medscape_single_walk)]:
+            best = min(timed_call(walk, contents) for _ in range(repeat))
+            results.append(walk(contents))
+            n_out = len(results[-1])
+            print(f"{n_sections:>9,} {n_nodes:>9,} {label:<14} {best:>9.4f} {n_out / best:>12,.0f}")
+        if results[0] != results[1]:
+            print("✗ walk_sections output differs from the double walk")
+
+
+def scan_resolve(titles, queries, min_score=section_index.MIN_SCORE):
+    """Resolve by scoring every query against every title, O(queries x titles)"""
+    title_grams = [section_index.trigrams(title) for title in titles]
+    resolved = {}
+    for key, query in queries:
+        grams = section_index.trigrams(query)
+        best_score, best_id = 0.0, None
+        for title_id, other in enumerate(title_grams):
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            if score > best_score:
+                best_score, best_id = score, title_id
+        if best_id is not None and best_score >= min_score:
+            resolved[key] = titles[best_id]
+    return resolved
+
+
+def bench_resolver(sizes, seed=0):
+    """Question-to-section resolution: trigram index vs a scan over every title
+
+    The index timing includes building it. candidates is the number of
+    titles the index scores per query, after its size and overlap filters.
+    """
+    print("\nResolving altered and unknown titles (one query per section)\n")
+    print(f"{'sections':>9} {'method':<8} {'time (s)':>9} {'queries/s':>11} "
+          f"{'resolved':>9} {'low conf.':>10} {'unresolved':>11} {'candidates':>11}")
+    for n_sections in sizes:
+        rng = random.Random(seed)
+        vocab = vocabulary(rng)
+        titles = list(dict.fromkeys(section_title(rng, vocab) for _ in range(n_sections)))
+        # Nine in ten queries are drifted headings, the rest are not on the page
+        queries = [(i, altered_title(title, rng) if rng.random() < 0.9 else section_title(rng, vocab))
+                   for i, title in enumerate(titles)]
+
+        start = time.perf_counter()
+        index = section_index.SectionIndex(titles)
+        resolved, low_confidence, unresolved = section_index.resolve_all(index, queries)
+        elapsed = time.perf_counter() - start
+        print(f"{len(titles):>9,} {'index':<8} {elapsed:>9.4f} {len(queries) / elapsed:>11,.0f} "
+              f"{len(resolved):>9,} {len(low_confidence):>10,} {len(unresolved):>11,} "
+              f"{index.scored / len(queries):>11,.1f}")
+
+        start = time.perf_counter()
+        scanned = scan_resolve(titles, queries)
+        elapsed = time.perf_counter() - start
+        print(f"{len(titles):>9,} {'scan':<8} {elapsed:>9.4f} {len(queries) / elapsed:>11,.0f} "
+              f"{len(scanned):>9,} {'':>10} {len(queries) - len(scanned):>11,} {len(titles):>11,}")
+        if {key: match.title for key, match in resolved.items()} != scanned:
+            print("✗ index and scan resolve differently")
+
+
+def timed_call(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML extraction benchmark')
+    parser.add_argument('benchmark', nargs='?', choices=['parse', 'medscape-pages', 'walker', 'resolver'],
+                        default='parse')
+    parser.add_argument('--sections', type=int, nargs='+', default=None,
+                        help='target sections per synthetic page (parse default: 1000 10000, '
+                             'medscape-pages default: 100, walker default: 100 1000, '
+                             'resolver default: 500 2000)')
+    parser.add_argument('--subsections', type=int, default=20,
+                        help='H3 subsections per H2 section in the walker benchmark')
+    parser.add_argument('--pages', type=int, default=200, help='pages in the medscape-pages benchmark')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.benchmark == 'parse':
+        bench_parse(args.sections or [1_000, 10_000], seed=args.seed)
+    elif args.benchmark == 'resolver':
+        bench_resolver(args.sections or [500, 2_000], seed=args.seed)
+    elif args.benchmark == 'walker':
+        bench_walker(args.sections or [100, 1_000], n_subsections=args.subsections, seed=args.seed)
+    else:
+        bench_medscape_pages(args.pages, (args.sections or [100])[0], workers=args.workers, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
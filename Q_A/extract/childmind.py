@@ -1,38 +1,42 @@
 import os
-from bs4 import BeautifulSoup
 import csv
 
+from html_engine import element_text, find, find_all, has_class, iter_sections
+
 html_file_path = 'data/raw/childmind_guide/child_mind.html'
 destination_folder = f"data/extracted"
-os.makedirs(destination_folder, exist_ok=True)
-
-try:
-    with open(html_file_path, 'r', encoding='utf-8') as file:
-        html_content = file.read()
-except FileNotFoundError:
-    print(f"File '{html_file_path}' not found.")
-except Exception as e:
-    print(f"An error occurred: {e}")
-soup = BeautifulSoup(html_content, 'html.parser')
-
-# Create a CSV file
-csv_file = open(f'{destination_folder}/childmind_extracted_data.csv', 'w', newline='', encoding='utf-8')
-csv_writer = csv.writer(csv_file, delimiter=";")
-csv_writer.writerow(['Question', 'Answer'])  # Header row
-
-# Iterate through sections with class 'guide-wrapper-block'
-for section in soup.find_all('section', class_='guide-wrapper-block'):
-    # Extract question and answer from the section
-    question = section.find('div', class_='flex-grow').text.strip()
-    answer_paragraphs = section.find('div', class_='pl-10').find_all('p')
-    answer = ' '.join([p.text.strip() for p in answer_paragraphs])
-
-    #remove , and new line
-    question = question.replace(';', '').replace('\n','')
-    answer = answer.replace(';', '').replace('\n','')
-
-    # Write to CSV file
-    csv_writer.writerow([question, answer])
-
-# Close the CSV file
-csv_file.close()
+
+
+def extract_rows(source):
+    """(question, answer) of every guide block of the Child Mind parents' guide"""
+    rows = []
+    # Iterate through sections with class 'guide-wrapper-block'
+    for section in iter_sections(source, 'section', has_class('guide-wrapper-block')):
+        # Extract question and answer from the section
+        question = element_text(find(section, 'div', has_class('flex-grow'))).strip()
+        answer_paragraphs = find_all(find(section, 'div', has_class('pl-10')), 'p')
+        answer = ' '.join([element_text(p).strip() for p in answer_paragraphs])
+
+        #remove , and new line
+        question = question.replace(';', '').replace('\n','')
+        answer = answer.replace(';', '').replace('\n','')
+        rows.append([question, answer])
+    return rows
+
+
+if __name__ == "__main__":
+    os.makedirs(destination_folder, exist_ok=True)
+    try:
+        rows = extract_rows(html_file_path)
+    except FileNotFoundError:
+        print(f"File '{html_file_path}' not found.")
+        raise SystemExit(1)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        raise SystemExit(1)
+
+    # Create a CSV file
+    with open(f'{destination_folder}/childmind_extracted_data.csv', 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.writer(csv_file, delimiter=";")
+        csv_writer.writerow(['Question', 'Answer'])  # Header row
+        csv_writer.writerows(rows)
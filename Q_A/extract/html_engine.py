@@ -0,0 +1,124 @@
+"""
+Shared HTML extraction engine for the Q&A extractors
+
+Pages are parsed with lxml's event parser (iterparse): only the elements
+closing with the target tag are examined, every matching section is handed
+to the caller as soon as it is complete and then freed, together with the
+already-seen siblings before it. Memory stays bounded by one section plus
+the still-open ancestors instead of the whole document tree.
+
+Text helpers reproduce BeautifulSoup's .text and .stripped_strings (comments,
+scripts and styles are left out) so the extracted rows do not change.
+"""
+
+import io
+
+from lxml import etree
+
+# Elements whose content is not page text
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+def has_class(name):
+    """Match elements whose class attribute contains the token name"""
+    def match(element):
+        return name in (element.get("class") or "").split()
+    return match
+
+
+def id_startswith(prefix):
+    """Match elements whose id starts with prefix, like div[id^=prefix]"""
+    def match(element):
+        return (element.get("id") or "").startswith(prefix)
+    return match
+
+
+def iter_sections(source, tag, match, encoding="utf-8"):
+    """Yield every complete <tag> element accepted by match, then free it
+
+    source is a file path, a file object or the HTML as bytes / str. The
+    yielded element is only valid until the next one is requested.
+    """
+    if isinstance(source, str) and source.lstrip().startswith("<"):
+        source = source.encode(encoding)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    for _, element in etree.iterparse(source, events=("end",), tag=tag, html=True,
+                                      encoding=encoding, recover=True):
+        if not match(element):
+            continue
+        yield element
+        # Drop the section and everything parsed before it at its level
+        element.clear(keep_tail=True)
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def iter_strings(element):
+    """Text nodes under element in document order, without comments, scripts and styles"""
+    if element.tag in SKIP_TEXT_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str):
+            yield from iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def element_text(element):
+    """All text under element, like BeautifulSoup's .text"""
+    return "".join(iter_strings(element))
+
+
+def clean_text(element):
+    """Stripped text nodes joined by spaces, like ' '.join(tag.stripped_strings)"""
+    if element.tag in SKIP_TEXT_TAGS:
+        return ""
+    if not len(element):
+        # Leaf element (most <p>, <li> and headings): its text is the only string
+        return (element.text or "").strip()
+    return " ".join(text for text in map(str.strip, iter_strings(element)) if text)
+
+
+def find(element, tag, match=None):
+    """First descendant <tag> accepted by match, or None"""
+    for child in element.iter(tag):
+        if child is not element and (match is None or match(child)):
+            return child
+    return None
+
+
+def find_all(element, tag, match=None):
+    """Every descendant <tag> accepted by match, in document order"""
+    return [child for child in element.iter(tag)
+            if child is not element and (match is None or match(child))]
+
+
+def walk_sections(elements, heading_tag="h3", content_tags=("p", "ul", "ol")):
+    """Split a run of sibling elements at every heading, in a single pass
+
+    Yields (heading, texts): first (None, texts) for the content before the
+    first heading, then (heading text, texts) for each heading, where texts
+    are the clean_text of the content elements up to the next heading.
+    """
+    heading = None
+    texts = []
+    for element in elements:
+        tag = element.tag
+        if tag == heading_tag:
+            yield heading, texts
+            heading = clean_text(element)
+            texts = []
+        elif tag in content_tags:
+            texts.append(clean_text(element))
+    yield heading, texts
+
+
+def child_elements(element):
+    """Direct element children, skipping comments and processing instructions"""
+    return [child for child in element if isinstance(child.tag, str)]
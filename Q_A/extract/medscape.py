@@ -1,94 +1,102 @@
 import os
-from bs4 import BeautifulSoup, Tag
 import csv
 import glob
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from html_engine import (child_elements, clean_text, find, has_class, id_startswith, iter_sections,
+                         walk_sections)
+from section_index import SectionIndex, resolve_all
+
 destination_folder = f"data/extracted"
-os.makedirs(destination_folder, exist_ok=True)
 
-def extract_medscape_sections(html):
-    soup = BeautifulSoup(html, "lxml")
+def extract_medscape_sections(source):
     sections = {}
 
     # Each Medscape section lives in content_*
-    for container in soup.select('div[id^="content_"]'):
-        h2 = container.find("h2", recursive=False)
-        content = container.find("div", class_="refsection_content")
+    for container in iter_sections(source, "div", id_startswith("content_")):
+        h2 = next((child for child in child_elements(container) if child.tag == "h2"), None)
+        content = find(container, "div", has_class("refsection_content"))
 
         # Skip if no meaningful content
-        if not h2 or not content:
+        if h2 is None or content is None:
             continue
 
-        # ---- H2 SECTION ----
-        current_h2 = clean_text(h2)
-        buffer = []
-
-        for child in content.children:
-            if not isinstance(child, Tag):
-                continue
-
-            # Stop H2 content when first H3 appears
-            if child.name == "h3":
-                break
-
-            if child.name in ("p", "ul", "ol"):
-                buffer.append(clean_text(child))
-
-        sections[current_h2] = {
-            "type": "h2",
-            "content": "\n".join(buffer).strip()
-        }
-
-        # ---- H3 SUBSECTIONS ----
-        current_h3 = None
-        buffer = []
-
-        for child in content.children:
-            if not isinstance(child, Tag):
-                continue
-
-            if child.name == "h3":
-                if current_h3:
-                    sections[current_h3] = {
-                        "type": "h3",
-                        "content": "\n".join(buffer).strip()
-                    }
-                current_h3 = clean_text(child)
-                buffer = []
-                continue
-
-            if current_h3 and child.name in ("p", "ul", "ol"):
-                buffer.append(clean_text(child))
-
-        # Save last h3
-        if current_h3:
-            sections[current_h3] = {
-                "type": "h3",
-                "content": "\n".join(buffer).strip()
-            }
+        # ---- H2 SECTION, then its H3 SUBSECTIONS, in one walk ----
+        for heading, texts in walk_sections(child_elements(content)):
+            if heading is None:
+                sections[clean_text(h2)] = {
+                    "type": "h2",
+                    "content": "\n".join(texts).strip()
+                }
+            elif heading:
+                sections[heading] = {
+                    "type": "h3",
+                    "content": "\n".join(texts).strip()
+                }
 
     return sections
 
-def clean_text(tag):
-    return " ".join(tag.stripped_strings)
+# Sections extracted from each page, keyed by the page's content hash. Bump
+# CACHE_VERSION when extract_medscape_sections changes its output.
+CACHE_DIR = Path("data/extracted/cache/medscape")
+CACHE_VERSION = 1
+
+
+def page_digest(file_path):
+    """SHA-256 of a page's bytes"""
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def cache_path(digest, cache_dir=CACHE_DIR):
+    return Path(cache_dir) / f"{digest}-v{CACHE_VERSION}.json"
 
-# ---- loop over all HTML files ----
-BASE_DIR = Path("data/raw/medscape")
-files = sorted(glob.glob(str(BASE_DIR / "medscape_912781-*.html")))
 
-keyword_content = {}
+def extract_pages(files, workers=None, cache_dir=CACHE_DIR):
+    """Sections of every page merged in file order, parsing only pages missing from the cache
 
-for file_path in files:
-    page_name = Path(file_path).stem.replace("medscape_912781-", "")
+    Uncached pages are parsed in a process pool. Returns the merged sections
+    and (pages parsed, pages read from the cache).
+    """
+    pages = {}
+    misses = []
+    for file_path in files:
+        cached = cache_path(page_digest(file_path), cache_dir) if cache_dir else None
+        if cached is not None and cached.exists():
+            with open(cached, encoding="utf-8") as f:
+                pages[file_path] = json.load(f)
+        else:
+            misses.append((file_path, cached))
+
+    workers = min(workers or os.cpu_count() or 1, len(misses))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(extract_medscape_sections, [path for path, _ in misses]))
+    else:
+        results = [extract_medscape_sections(path) for path, _ in misses]
+
+    for (file_path, cached), sections in zip(misses, results):
+        pages[file_path] = sections
+        if cached is not None:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            with open(cached, "w", encoding="utf-8") as f:
+                json.dump(sections, f, ensure_ascii=False)
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    keyword_content = {}
+    for file_path in files:
+        keyword_content.update(pages[file_path])
+    return keyword_content, (len(misses), len(files) - len(misses))
 
-    sections = extract_medscape_sections(html)
-    keyword_content.update(sections)
 
-# This maps each question to a keyword for the answer
+BASE_DIR = Path("data/raw/medscape")
+
+# This maps each question to a keyword for the answer. Only the keywords are
+# resolved to the closest extracted section title (section_index), not the
+# questions, so a keyword only needs to stay close to the heading on the page
 qa_section_map = {
     # ======================
     # OVERVIEW
@@ -191,16 +199,38 @@ qa_section_map = {
     "What is the efficacy of medications for the treatment of autism spectrum disorder (ASD)?": "Pharmacologic Treatment"
 }
 
-with open(f'{destination_folder}/medscape_extracted_data.csv', 'w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f, delimiter=";")
-    writer.writerow(['Question', 'Keyword', 'Answer'])
-    for question, keyword in qa_section_map.items():
-        if keyword in keyword_content:
-            writer.writerow([question, 
-                             keyword, 
-                             keyword_content[keyword]['content'].strip().replace(';', '').replace('\n',' ')])
-        else:
-            print(f"Keyword {keyword} not found in scrapped data")
+if __name__ == "__main__":
+    os.makedirs(destination_folder, exist_ok=True)
+
+    # ---- loop over all HTML files ----
+    files = sorted(glob.glob(str(BASE_DIR / "medscape_912781-*.html")))
+
+    start = time.perf_counter()
+    keyword_content, (parsed, cached) = extract_pages(files)
+    print(f"{len(files)} page(s): {parsed} parsed, {cached} from cache "
+          f"in {time.perf_counter() - start:.3f}s")
+
+    index = SectionIndex(keyword_content)
+    resolved, low_confidence, unresolved = resolve_all(index, qa_section_map.items())
+    for question, keyword, match in low_confidence:
+        print(f"Keyword {keyword} resolved to {match.title} (score {match.score:.2f})")
+    for question, keyword, candidate in unresolved:
+        hint = f", closest: {candidate.title} ({candidate.score:.2f})" if candidate else ""
+        print(f"Keyword {keyword} not found in scrapped data{hint}")
+    print(f"{len(qa_section_map)} question(s): {len(resolved)} resolved "
+          f"({len(low_confidence)} low confidence), {len(unresolved)} unresolved")
+
+    with open(f'{destination_folder}/medscape_extracted_data.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(['Question', 'Keyword', 'Answer', 'Section', 'Score'])
+        for question, keyword in qa_section_map.items():
+            if question in resolved:
+                match = resolved[question]
+                writer.writerow([question, 
+                                 keyword, 
+                                 keyword_content[match.title]['content'].strip().replace(';', '').replace('\n',' '),
+                                 match.title,
+                                 f"{match.score:.2f}"])
 
                 
 
@@ -0,0 +1,204 @@
+"""
+Trigram index over extracted section titles
+
+Questions are resolved to section titles by fuzzy matching instead of exact
+dict lookups, so a heading that changes slightly on the site ("Vaccination"
+-> "Vaccinations", "Cognitive behavior therapy (CBT)" -> "Cognitive
+behavioral therapy") still resolves. Titles are normalized (lowercase,
+punctuation dropped) and split into character trigrams. The score is the
+Dice coefficient of the two trigram sets: 1.0 for the same normalized title,
+0.0 for nothing in common.
+
+A query is not scored against every section. For a query of a trigrams and
+a title of b to reach min_score t they must share o = t * (a + b) / 2 of
+them, which gives three filters, applied before any score is computed:
+
+- size: only titles with t * a / (2 - t) <= b <= (2 - t) * a / t can reach
+  o; the postings are sorted by title size and cut to that range.
+- prefix: with the trigrams of both sorted rarest first, the first
+  a - o + 1 of the query and the first b - o + 1 of the title have one in
+  common. Only those title prefixes are indexed and only the query prefix is
+  looked up.
+- overlap: both sides share that order, so when the i-th query trigram
+  matches the j-th title trigram the title can still gain at most
+  min(a - i, b - j) - 1 trigrams. A title that can no longer reach o is
+  dropped for the rest of the lookup.
+
+Only the titles left are scored.
+"""
+
+import math
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, namedtuple
+
+# Below MIN_SCORE a query is unresolved, below CONFIDENT_SCORE it is reported
+MIN_SCORE = 0.6
+CONFIDENT_SCORE = 0.85
+
+Match = namedtuple("Match", ["title", "score"])
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Lowercase words separated by single spaces, punctuation dropped"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(text):
+    """Character trigrams of the normalized text, padded so short words count"""
+    padded = f"  {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SectionIndex:
+    """Resolve free-text queries to the best-matching title scoring at least min_score"""
+
+    def __init__(self, titles, min_score=MIN_SCORE):
+        self.min_score = min_score
+        self.titles = []
+        self.grams = []
+        self.exact = {}
+        for title in titles:
+            key = normalize(title)
+            if key not in self.exact:
+                self.exact[key] = len(self.titles)
+                self.titles.append(title)
+                self.grams.append(trigrams(title))
+        # Titles scored by best(), to check how many the filters leave
+        self.scored = 0
+
+        self.frequency = Counter(gram for grams in self.grams for gram in grams)
+        # Titles are looked up by queries at least as long through a shorter
+        # prefix than by longer queries (see prefix_length), so each has both
+        mid, full = defaultdict(list), defaultdict(list)
+        for title_id, grams in enumerate(self.grams):
+            size = len(grams)
+            ordered = self.rarest_first(grams)
+            for position, gram in enumerate(ordered[:self.prefix_length(size, True)]):
+                mid[gram].append((size, title_id, position))
+            for position, gram in enumerate(ordered[:self.prefix_length(size, False)]):
+                full[gram].append((size, title_id, position))
+        self.mid_postings = self.sorted_postings(mid)
+        self.full_postings = self.sorted_postings(full)
+
+    def __len__(self):
+        return len(self.titles)
+
+    @staticmethod
+    def sorted_postings(entries):
+        """Per trigram: title sizes (sorted, for the size filter) and the
+        matching (title id, position in the title's sorted trigrams)"""
+        postings = {}
+        for gram, posting in entries.items():
+            posting.sort()
+            postings[gram] = ([size for size, _, _ in posting],
+                              [(title_id, position) for _, title_id, position in posting])
+        return postings
+
+    def rarest_first(self, grams):
+        return sorted(grams, key=lambda gram: (self.frequency.get(gram, 0), gram))
+
+    def overlap(self, size, other_size):
+        """Trigrams two sets of these sizes share when they reach min_score"""
+        return math.ceil(self.min_score * (size + other_size) / 2 - 1e-9)
+
+    def prefix_length(self, size, not_shorter):
+        """Prefix of a set of size sharing a trigram with any match
+
+        A match at least as long (not_shorter) shares at least min_score *
+        size trigrams; over the whole size range, at least min_score * size /
+        (2 - min_score).
+        """
+        t = self.min_score
+        if not_shorter:
+            shared = math.ceil(t * size - 1e-9)
+        else:
+            shared = math.ceil(t * size / (2 - t) - 1e-9)
+        return size - max(1, shared) + 1
+
+    def best(self, query):
+        """Best-scoring Match among the titles left by the filters, at any score
+
+        None when every title was filtered out. Its score is below min_score
+        when no title reaches it; it then still names the closest candidate.
+        """
+        title_id = self.exact.get(normalize(query))
+        if title_id is not None:
+            return Match(self.titles[title_id], 1.0)
+
+        grams = trigrams(query)
+        size = len(grams)
+        t = self.min_score
+        ordered = self.rarest_first(grams)
+        # Trigrams shared so far per title, None once it cannot reach min_score
+        shared = {}
+        # Titles no longer than the query through their mid prefix, longer
+        # ones through their full prefix
+        tiers = [
+            (self.mid_postings, t * size / (2 - t) - 1e-9, size + 1e-9, self.prefix_length(size, False)),
+            (self.full_postings, size + 0.5, (2 - t) * size / t + 1e-9, self.prefix_length(size, True))
+        ]
+        # Trigrams to share with a title of each size within the size range
+        needed = [self.overlap(size, title_size) for title_size in range(int(tiers[1][2]) + 1)]
+        for postings, low, high, probe in tiers:
+            for i, gram in enumerate(ordered[:probe]):
+                posting = postings.get(gram)
+                if posting is None:
+                    continue
+                sizes, matches = posting
+                # A title first met at position i can still gain size - i
+                # trigrams, enough only up to this size
+                reachable = min(high, 2 * (size - i) / t - size + 1e-9)
+                left = size - i
+                for k in range(bisect_left(sizes, low), bisect_right(sizes, reachable)):
+                    title_id, j = matches[k]
+                    count = shared.get(title_id, 0)
+                    if count is None:
+                        continue
+                    title_size = sizes[k]
+                    # Matched at (i, j): the title gains at most the shorter rest
+                    if count + (left if left < title_size - j else title_size - j) < needed[title_size]:
+                        shared[title_id] = None
+                    else:
+                        shared[title_id] = count + 1
+
+        best_score, best_id = -1.0, None
+        for title_id, count in shared.items():
+            if count is None:
+                continue
+            self.scored += 1
+            other = self.grams[title_id]
+            score = 2 * len(grams & other) / (size + len(other))
+            # Ties go to the title indexed first, as with a scan in title order
+            if score > best_score or (score == best_score and title_id < best_id):
+                best_score, best_id = score, title_id
+        return None if best_id is None else Match(self.titles[best_id], best_score)
+
+    def resolve(self, query):
+        """Best Match for query, or None when no title scores at least min_score"""
+        match = self.best(query)
+        return match if match is not None and match.score >= self.min_score else None
+
+
+def resolve_all(index, queries, confident_score=CONFIDENT_SCORE):
+    """Resolve every (key, query) pair
+
+    Returns (resolved, low_confidence, unresolved): resolved maps key to its
+    Match, low_confidence lists (key, query, match) for the resolved matches
+    scoring below confident_score and unresolved lists (key, query, closest
+    candidate or None) for the queries with no match at index.min_score. The
+    closest candidate is the best title the lookup scored, not the result of
+    a scan over every title.
+    """
+    resolved, low_confidence, unresolved = {}, [], []
+    for key, query in queries:
+        match = index.best(query)
+        if match is None or match.score < index.min_score:
+            unresolved.append((key, query, match))
+            continue
+        resolved[key] = match
+        if match.score < confident_score:
+            low_confidence.append((key, query, match))
+    return resolved, low_confidence, unresolved
@@ -40,9 +40,7 @@ REM Run pipeline
 REM -------------------------------
 echo Running crawling step...
 cd aquisition/crawler
-scrapy crawl childmind_guide
-scrapy crawl autismhub
-scrapy crawl medscape
+python crawl_all.py
 cd ../..
 
 echo Running extraction step...
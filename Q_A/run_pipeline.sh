@@ -36,9 +36,7 @@ python -m pip install -r requirements.txt
 # -------------------------------
 echo "Running crawling step..."
 cd aquisition/crawler
-scrapy crawl childmind_guide
-scrapy crawl autismhub
-scrapy crawl medscape
+python crawl_all.py
 cd ../..
 
 echo "Running extraction step..."
@@ -0,0 +1,123 @@
+"""
+Benchmark of the answer cleaning: previous replace_patterns vs noise_rules
+
+Builds a synthetic corpus of answers carrying the noise the rules remove
+(citations, "See the image" / "Read more" sentences, trailing colons,
+non-breaking spaces, Medscape print footers, Autism Hub signatures), cleans
+it with the previous per-answer re.sub chain through Series.apply and with
+NoiseCleaner, checks that both give the same answers and prints the times
+and the hits of every rule.
+
+    python transform/benchmark_transform.py --answers 1000000
+"""
+
+import argparse
+import random
+import re
+import time
+
+import pandas as pd
+
+from noise_rules import NoiseCleaner
+
+WORDS = ("autism spectrum disorder children diagnosis social communication behavior "
+         "therapy parents school support development screening clinician early").split()
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation (transform.replace_patterns)
+# ---------------------------------------------------------------------------
+
+def replace_patterns(answer):
+    pattern = r'\[\s*\d+(?:\s*,\s*\d+)*\s*\]'
+    answer = re.sub(pattern, '', answer)
+    answer = re.sub(r'(?i)\bsee the image\b.*?(?:\.|$)', '', answer)
+    answer = re.sub(r'(?i)\bread more\b.*?(?:\.|$)', '', answer)
+    answer = re.sub(r':\s*$', '.', answer)
+    answer = answer.replace('\u00a0', ' ')
+    answer = re.sub(r"emedicine\.medscape\.com/article/\d+-print", "", answer)
+    answer = re.sub(r' \u2013 The Autism Hub Team.*', '', answer)
+    return answer
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+def sentence(rng, n_words=12):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(n_words // 2, n_words))]
+    separator = '\u00a0' if rng.random() < 0.1 else ' '
+    return separator.join(words).capitalize() + "."
+
+
+def citation(rng):
+    numbers = [str(rng.randint(1, 60)) for _ in range(rng.randint(1, 3))]
+    return "[" + rng.choice([",", ", "]).join(numbers) + "]"
+
+
+def synthetic_answer(rng):
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        text = sentence(rng)
+        if rng.random() < 0.3:
+            text = text[:-1] + citation(rng) + "."
+        parts.append(text)
+    if rng.random() < 0.05:
+        parts.insert(rng.randrange(len(parts) + 1), f"See the image of {rng.choice(WORDS)} below.")
+    if rng.random() < 0.05:
+        parts.append(f"Read more about {rng.choice(WORDS)} here.")
+    if rng.random() < 0.03:
+        parts.append("emedicine.medscape.com/article/912781-print")
+    answer = " ".join(parts)
+    if rng.random() < 0.03:
+        answer = answer[:-1] + ":" + rng.choice(["", " ", "\u00a0"])
+    if rng.random() < 0.03:
+        answer += f" \u2013 The Autism Hub Team {citation(rng)}"
+    return answer
+
+
+def corpus(n_answers, seed=0):
+    rng = random.Random(seed)
+    return pd.Series([synthetic_answer(rng) for _ in range(n_answers)])
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def bench_clean(n_answers, seed=0):
+    start = time.perf_counter()
+    answers = corpus(n_answers, seed)
+    print(f"{n_answers:,} synthetic answers, {answers.str.len().sum() / 1e6:,.1f}M characters "
+          f"(built in {time.perf_counter() - start:.1f}s)\n")
+
+    start = time.perf_counter()
+    previous = answers.apply(replace_patterns)
+    previous_time = time.perf_counter() - start
+
+    cleaner = NoiseCleaner()
+    start = time.perf_counter()
+    cleaned = cleaner.clean(answers)
+    cleaner_time = time.perf_counter() - start
+
+    print(f"{'implementation':<32} {'time (s)':>9} {'answers/s':>12}")
+    print(f"{'replace_patterns (apply)':<32} {previous_time:>9.3f} {n_answers / previous_time:>12,.0f}")
+    print(f"{'NoiseCleaner':<32} {cleaner_time:>9.3f} {n_answers / cleaner_time:>12,.0f}")
+    print(f"speedup: {previous_time / cleaner_time:.2f}x\n")
+    print("\n".join(cleaner.report()))
+
+    mismatches = sum(a != b for a, b in zip(previous, cleaned))
+    if mismatches:
+        print(f"\n✗ {mismatches:,} answer(s) differ from replace_patterns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Answer cleaning benchmark')
+    parser.add_argument('--answers', type=int, default=1_000_000, help='synthetic answers to clean')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    bench_clean(args.answers, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Streaming reader and writers for the Q&A records
+
+Records (dicts) are written one at a time, straight from a DataFrame or any
+generator, either as JSON Lines (one compact object per line) or as one JSON
+array, compact or indented like json.dump(records, indent=...). The reader
+yields them back one at a time from either format, so a corpus is never held
+whole in memory on either side.
+
+The compression follows the file suffix: .gz (gzip) or .zst (zstd, needs the
+zstandard package), e.g. clean_data.jsonl.gz.
+"""
+
+import gzip
+import itertools
+import json
+import re
+
+try:
+    import zstandard
+except ImportError:  # only needed for .zst files
+    zstandard = None
+
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+CHUNK_SIZE = 1 << 16
+BATCH_SIZE = 1_000
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def open_text(path, mode="r"):
+    """Text stream on path, compressed according to its suffix"""
+    path = str(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstd files need the zstandard package (pip install zstandard)")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def records_format(path):
+    """'jsonl' or 'json' from the suffix before the compression suffix"""
+    path = str(path)
+    for suffix in COMPRESSIONS.values():
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    return "jsonl" if path.endswith(".jsonl") else "json"
+
+
+def frame_records(df):
+    """Rows of df as dicts, one at a time"""
+    columns = list(df.columns)
+    for row in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, row))
+
+
+def _to_builtin(value):
+    # numpy scalars coming from DataFrame rows
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_records(records, path, fmt=None, indent=None):
+    """Write records to path as JSON Lines or a JSON array; returns how many were written
+
+    fmt defaults to the suffix of path (see records_format). indent only
+    applies to JSON arrays; without it the array is written compact.
+    """
+    fmt = fmt or records_format(path)
+    if fmt == "jsonl" or indent is None:
+        encoder = json.JSONEncoder(separators=(",", ":"), default=_to_builtin)
+        opening, separator, closing = "[", ",", "]"
+    else:
+        # Same layout as json.dump(list_of_records, indent=indent)
+        encoder = json.JSONEncoder(indent=indent, default=_to_builtin)
+        opening, separator, closing = "[\n", ",\n", "\n]"
+
+    count = 0
+    with open_text(path, "w") as f:
+        # Records are encoded BATCH_SIZE at a time: one encoder call per
+        # batch instead of per record, and only one batch in memory
+        for batch in _batches(records, BATCH_SIZE):
+            if fmt == "jsonl":
+                f.write("".join(encoder.encode(record) + "\n" for record in batch))
+            else:
+                # The batch encoded as an array, without the brackets around its items
+                text = encoder.encode(batch)
+                f.write(separator if count else opening)
+                f.write(text[len(opening):-len(closing)])
+            count += len(batch)
+        if fmt != "jsonl":
+            f.write(closing if count else "[]")
+    return count
+
+
+def _batches(records, size):
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def read_records(path, fmt=None):
+    """Yield the records of a file written by write_records (or any JSON array / JSON Lines file)"""
+    fmt = fmt or records_format(path)
+    with open_text(path) as f:
+        if fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_array(f)
+
+
+def _iter_array(f):
+    """Items of the top-level JSON array in the text stream f, decoded chunk by chunk"""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    # What comes next: "[", the first item or "]", an item, "," or "]"
+    expected = "start"
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unterminated JSON array" if expected != "start" else "Empty JSON file")
+            buffer, pos, eof = _read_more(f, buffer, pos)
+            continue
+
+        char = buffer[pos]
+        if expected == "start":
+            if char != "[":
+                raise ValueError(f"Expected a JSON array, got {char!r}")
+            pos += 1
+            expected = "first"
+        elif char == "]" and expected in ("first", "separator"):
+            return
+        elif expected == "separator":
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+            pos += 1
+            expected = "item"
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            # An item running to the end of the buffer may be cut short (e.g. a number)
+            if end is None or (end == len(buffer) and not eof):
+                buffer, pos, eof = _read_more(f, buffer, pos)
+                continue
+            yield item
+            pos = end
+            expected = "separator"
+
+
+def _read_more(f, buffer, pos):
+    """Drop the consumed part of buffer and append the next chunk of f
+
+    The chunk is at least as large as what is left, so a long item is
+    decoded again only a logarithmic number of times.
+    """
+    chunk = f.read(max(CHUNK_SIZE, len(buffer) - pos))
+    return buffer[pos:] + chunk, 0, not chunk
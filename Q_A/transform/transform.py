@@ -1,7 +1,18 @@
+import argparse
 import os
 import pandas as pd
-import re
-import json
+
+from noise_rules import NoiseCleaner
+from records_io import COMPRESSIONS, frame_records, write_records
+
+parser = argparse.ArgumentParser(description="Merge and clean the extracted Q&A data")
+parser.add_argument("--format", choices=["json", "jsonl"], default="json",
+                    help="one JSON array (default) or JSON Lines, one record per line")
+parser.add_argument("--indent", type=int, default=4,
+                    help="indent of the JSON array, 0 for compact output (default: 4)")
+parser.add_argument("--compress", choices=sorted(COMPRESSIONS), default=None,
+                    help="compress the output (zstd needs the zstandard package)")
+args = parser.parse_args()
 
 destination_folder = f"data/transformed"
 os.makedirs(destination_folder, exist_ok=True)
@@ -25,55 +36,20 @@ concatenated_df = pd.concat([childmind, medscape, parent_guide, ask_autism])
 # Reset the index of the concatenated dataframe
 concatenated_df.reset_index(drop=True, inplace=True)
 
-# Define a function to replace the patterns in the 'Answer' column
-def replace_patterns(answer):
-    # Remove patterns like [1], [4,3], [2, 4,3]
-    # pattern = r'\[\d+(?:,\s*\d+)*\]'
-    pattern = r'\[\s*\d+(?:\s*,\s*\d+)*\s*\]'
-    answer = re.sub(pattern, '', answer)
-    
-    # Remove "See the image " 
-    answer = re.sub(r'(?i)\bsee the image\b.*?(?:\.|$)', '', answer)
-
-    answer = re.sub(r'(?i)\bread more\b.*?(?:\.|$)', '', answer)
-
-    # Remove incomplete answers
-    answer = re.sub(r':\s*$', '.', answer)
-
-    answer = answer.replace('\u00a0', ' ')
-
-    # Remove footer with URL + page number
-    answer = re.sub(
-        r"emedicine\.medscape\.com/article/\d+-print",
-        "",
-        answer
-    )
-    
-    # Remove "The autism Hub Team" from the end of responses with possible references
-    answer = re.sub(r' \u2013 The Autism Hub Team.*', '', answer)
-
-
-    
-    return answer
-
 # Droping lines with no answers that might accur from scraping bugs
 concatenated_df = concatenated_df.dropna()
 
 print(len(concatenated_df))
 
-# Replacing noisy patterns such as references
-concatenated_df['Answer'] = concatenated_df['Answer'].apply(replace_patterns)
-
-# Convert DataFrame to JSON
-json_data = concatenated_df.to_json(orient='records')
-
-json_data = json.loads(json_data)
+# Replacing noisy patterns such as references (rules in noise_rules.py)
+cleaner = NoiseCleaner()
+concatenated_df['Answer'] = cleaner.clean(concatenated_df['Answer'])
+print("\n".join(cleaner.report()))
 
 # Specify the file path where you want to save the JSON data
-json_file_path = f'{destination_folder}/clean_data.json'
+json_file_path = f'{destination_folder}/clean_data.{args.format}' + COMPRESSIONS.get(args.compress, '')
 
-# Write JSON data to the file
-with open(json_file_path, 'w') as json_file:
-    json.dump(json_data, json_file, indent=4)
+# Stream the records straight from the dataframe to the file
+write_records(frame_records(concatenated_df), json_file_path, fmt=args.format, indent=args.indent or None)
 
 print(f"JSON data has been saved to {json_file_path}")
\ No newline at end of file